@@ -1,5 +1,12 @@
 from .fields import MongoengineConnectionField
 from .fields_async import AsyncMongoengineConnectionField
+from .mutations import (
+    MongoengineCreateManyMutation,
+    MongoenginePartialUpdateMutation,
+    MongoengineUpdateManyMutation,
+    MongoengineUpsertManyMutation,
+)
+from .subscriptions import MongoengineSubscriptionField
 from .types import MongoengineInputType, MongoengineInterfaceType, MongoengineObjectType
 from .types_async import AsyncMongoengineObjectType
 
@@ -13,4 +20,9 @@ __all__ = [
     "MongoengineInterfaceType",
     "MongoengineConnectionField",
     "AsyncMongoengineConnectionField",
+    "MongoengineCreateManyMutation",
+    "MongoenginePartialUpdateMutation",
+    "MongoengineUpdateManyMutation",
+    "MongoengineUpsertManyMutation",
+    "MongoengineSubscriptionField",
 ]
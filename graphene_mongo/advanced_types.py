@@ -2,6 +2,87 @@ import base64
 
 import graphene
 from graphene_federation import shareable
+from mongoengine.connection import get_db
+from mongoengine.fields import GridFSProxy
+
+from .utils import (
+    get_context_value,
+    get_max_time_ms,
+    get_read_preference,
+    set_context_value,
+    with_read_preference,
+)
+
+# GridFS `fs.files` keys backing the FileFieldType metadata fields
+FILE_DOCUMENT_FIELDS = {
+    "content_type": "contentType",
+    "md5": "md5",
+    "chunk_size": "chunkSize",
+    "length": "length",
+}
+
+
+class GridFSFileLoader:
+    """
+    Request-scoped loader of GridFS `fs.files` documents. Files primed by a connection
+    page are fetched together with one `$in` the first time any of their metadata
+    fields is resolved; chunks are never touched.
+    """
+
+    context_key = "graphene_mongo_gridfs_loader"
+
+    def __init__(self, max_time_ms=None):
+        self.max_time_ms = max_time_ms
+        self.documents = {}
+        self.pending = {}
+
+    @classmethod
+    def for_request(cls, info):
+        loader = get_context_value(info, cls.context_key)
+        if loader is None:
+            loader = cls()
+            set_context_value(info, cls.context_key, loader)
+        return loader
+
+    @staticmethod
+    def get_key(proxy):
+        return proxy.db_alias, proxy.collection_name, proxy.grid_id
+
+    def prime(self, proxy):
+        if not isinstance(proxy, GridFSProxy) or proxy.grid_id is None:
+            return
+        if self.get_key(proxy) not in self.documents:
+            self.pending.setdefault((proxy.db_alias, proxy.collection_name), set()).add(
+                proxy.grid_id
+            )
+
+    def prime_documents(self, documents, field_names):
+        for document in documents:
+            for name in field_names:
+                self.prime(getattr(document, name, None))
+
+    def fetch(self, db_alias, collection_name, info=None):
+        grid_ids = self.pending.pop((db_alias, collection_name), set())
+        for grid_id in grid_ids:
+            self.documents[(db_alias, collection_name, grid_id)] = None
+        files = with_read_preference(
+            get_db(db_alias)["{}.files".format(collection_name)], get_read_preference(info)
+        )
+        for document in files.find(
+            {"_id": {"$in": list(grid_ids)}},
+            {name: 1 for name in FILE_DOCUMENT_FIELDS.values()},
+            max_time_ms=get_max_time_ms(info, self.max_time_ms),
+        ):
+            self.documents[(db_alias, collection_name, document["_id"])] = document
+
+    def load(self, proxy, info=None):
+        if proxy.grid_id is None:
+            return None
+        key = self.get_key(proxy)
+        if key not in self.documents:
+            self.prime(proxy)
+            self.fetch(proxy.db_alias, proxy.collection_name, info)
+        return self.documents[key]
 
 
 @shareable  # Support Graphene Federation v2
@@ -10,31 +91,42 @@ class FileFieldType(graphene.ObjectType):
     md5 = graphene.String()
     chunk_size = graphene.Int()
     length = graphene.Int()
-    data = graphene.String()
+    data = graphene.String(
+        offset=graphene.Int(description="Byte offset to start reading the file at."),
+        length=graphene.Int(description="Maximum number of bytes to read."),
+    )
 
     @classmethod
-    def _resolve_fs_field(cls, field, name, default_value=None):
+    def _resolve_fs_field(cls, field, name, default_value=None, info=None):
         v = getattr(field.instance, field.key)
-        return getattr(v, name, default_value)
+        document = GridFSFileLoader.for_request(info).load(v, info)
+        if document is None:
+            return default_value
+        return document.get(FILE_DOCUMENT_FIELDS[name], default_value)
 
     def resolve_content_type(self, info):
-        return FileFieldType._resolve_fs_field(self, "content_type")
+        return FileFieldType._resolve_fs_field(self, "content_type", info=info)
 
     def resolve_md5(self, info):
-        return FileFieldType._resolve_fs_field(self, "md5")
+        return FileFieldType._resolve_fs_field(self, "md5", info=info)
 
     def resolve_chunk_size(self, info):
-        return FileFieldType._resolve_fs_field(self, "chunk_size", 0)
+        return FileFieldType._resolve_fs_field(self, "chunk_size", 0, info=info)
 
     def resolve_length(self, info):
-        return FileFieldType._resolve_fs_field(self, "length", 0)
+        return FileFieldType._resolve_fs_field(self, "length", 0, info=info)
 
-    def resolve_data(self, info):
+    def resolve_data(self, info, offset=0, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("`offset` and `length` must be non-negative")
         v = getattr(self.instance, self.key)
-        data = v.read()
-        if data is not None:
-            return base64.b64encode(data).decode("utf-8")
-        return None
+        grid_out = v.get()
+        if grid_out is None:
+            return None
+        # GridOut only fetches the chunks overlapping the requested range
+        grid_out.seek(offset)
+        data = grid_out.read(-1 if length is None else length)
+        return base64.b64encode(data).decode("utf-8")
 
 
 @shareable  # Support Graphene Federation v2
@@ -61,6 +153,11 @@ class PolygonFieldType(_CoordinatesTypeField):
     coordinates = graphene.List(graphene.List(graphene.List(graphene.Float)))
 
 
+class PolygonFieldInputType(graphene.InputObjectType):
+    type = graphene.String(default_value="Polygon")
+    coordinates = graphene.List(graphene.List(graphene.List(graphene.Float)), required=True)
+
+
 class MultiPolygonFieldType(_CoordinatesTypeField):
     coordinates = graphene.List(
         graphene.List(
@@ -0,0 +1,185 @@
+import graphene
+from bson import ObjectId
+from graphene.relay.connection import ConnectionOptions
+from graphene.types.generic import GenericScalar
+from graphql import FieldNode, FragmentSpreadNode, get_named_type
+from graphql.execution.values import get_argument_values
+
+from .utils import ExecutorEnum, sync_to_async, with_read_preference
+
+
+class AggregateGroup(graphene.ObjectType):
+    key = GenericScalar()
+    count = graphene.Int()
+
+
+def resolve_aggregate_value(root, info, **args):
+    return root.get(info.path.key)
+
+
+def construct_aggregate_field(name, model, aggregate_fields):
+    """
+    Args:
+        name (str): name of the node type
+        model (mongoengine.Document):
+        aggregate_fields ([str]): fields clients may aggregate and group on
+
+    Returns:
+        graphene.Field: `aggregate` field of the connection type, run as one pipeline
+            over the connection's filter when selected
+    """
+    values = []
+    for field in aggregate_fields:
+        assert field in model._fields, 'The aggregate field "{}" is not a field of {}.'.format(
+            field, model.__name__
+        )
+        values.append((field.upper(), field))
+    field_enum = graphene.Enum("{}AggregateField".format(name), values)
+
+    def field_argument():
+        return graphene.Argument(field_enum, required=True)
+
+    attrs = {
+        "count": graphene.Int(resolver=resolve_aggregate_value),
+        "sum": graphene.Float(field=field_argument(), resolver=resolve_aggregate_value),
+        "avg": graphene.Float(field=field_argument(), resolver=resolve_aggregate_value),
+        "min": GenericScalar(field=field_argument(), resolver=resolve_aggregate_value),
+        "max": GenericScalar(field=field_argument(), resolver=resolve_aggregate_value),
+        "group_by": graphene.List(
+            graphene.NonNull(AggregateGroup),
+            field=field_argument(),
+            resolver=resolve_aggregate_value,
+        ),
+    }
+    aggregate_type = type("{}Aggregate".format(name), (graphene.ObjectType,), attrs)
+    return graphene.Field(aggregate_type, resolver=resolve_aggregate)
+
+
+def with_aggregate_field(connection, aggregate_field):
+    """
+    Subclass of `connection` with the `aggregate` field, keeping its other fields, so
+    that the connection given in `Meta.connection` is left as declared
+    """
+    _meta = ConnectionOptions(connection)
+    _meta.fields = dict(connection._meta.fields, aggregate=aggregate_field)
+    meta = {
+        "node": connection._meta.node,
+        "name": connection._meta.name,
+        "description": connection._meta.description,
+        "interfaces": connection._meta.interfaces,
+        "_meta": _meta,
+    }
+    return type(connection.__name__, (connection,), {"Meta": meta})
+
+
+def iter_selections(info, selection_set):
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+            continue
+        if isinstance(selection, FragmentSpreadNode):
+            selection = info.fragments.get(selection.name.value)
+            if selection is None:
+                continue
+        yield from iter_selections(info, selection.selection_set)
+
+
+def get_aggregate_facets(info, model):
+    """Builds a `$facet` stage computing the aggregates selected, by response key"""
+    aggregate_type = get_named_type(info.return_type)
+    totals = {"_id": None}
+    facets = {}
+    for field_node in info.field_nodes:
+        for node in iter_selections(info, field_node.selection_set):
+            name = node.name.value
+            if name not in aggregate_type.fields:
+                continue
+            key = node.alias.value if node.alias else name
+            args = get_argument_values(aggregate_type.fields[name], node, info.variable_values)
+            if name == "count":
+                totals[key] = {"$sum": 1}
+                continue
+            field = getattr(args["field"], "value", args["field"])
+            db_field = "$" + model._fields[field].db_field
+            if name == "groupBy":
+                facets[key] = [
+                    {"$group": {"_id": db_field, "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                ]
+            else:
+                totals[key] = {"$" + name: db_field}
+    if len(totals) > 1:
+        facets["_totals"] = [{"$group": totals}]
+    return facets
+
+
+def get_match_stages(query):
+    """
+    Stages selecting the documents matching `query`. `$near` can't be part of a
+    `$match`, it runs as a leading `$geoNear` stage filtering on the rest of the query.
+    """
+    for key, value in query.items():
+        if not isinstance(value, dict):
+            continue
+        operator = next((each for each in ("$near", "$nearSphere") if each in value), None)
+        if operator is None:
+            continue
+        near = value[operator]
+        # GeoJSON points carry their bounds, legacy coordinates have them next to them
+        bounds = near if isinstance(near, dict) and "$geometry" in near else value
+        geo_near = {
+            "near": near["$geometry"] if bounds is near else near,
+            "distanceField": "_graphene_mongo_distance",
+            "key": key,
+            "spherical": bounds is near or operator == "$nearSphere",
+            "query": {each: query[each] for each in query if each != key},
+        }
+        for bound, option in (("$maxDistance", "maxDistance"), ("$minDistance", "minDistance")):
+            if bound in bounds:
+                geo_near[option] = bounds[bound]
+        return [{"$geoNear": geo_near}]
+    return [{"$match": query}]
+
+
+def run_aggregate(queryset, facets):
+    if not facets:
+        return {}
+    pipeline = get_match_stages(queryset._query) + [{"$facet": facets}]
+    kwargs = {}
+    if queryset._max_time_ms is not None:
+        kwargs["maxTimeMS"] = queryset._max_time_ms
+    collection = with_read_preference(queryset._collection, queryset._read_preference)
+    row = next(iter(collection.aggregate(pipeline, **kwargs)), {})
+
+    result = {}
+    for key, groups in row.items():
+        if key == "_totals":
+            continue
+        result[key] = [
+            AggregateGroup(
+                key=str(group["_id"]) if isinstance(group["_id"], ObjectId) else group["_id"],
+                count=group["count"],
+            )
+            for group in groups
+        ]
+    totals = (row.get("_totals") or [{}])[0]
+    for key, accumulator in facets.get("_totals", [{"$group": {}}])[0]["$group"].items():
+        if key == "_id":
+            continue
+        value = totals.get(key)
+        # No document matched
+        if value is None and accumulator == {"$sum": 1}:
+            value = 0
+        result[key] = value
+    return result
+
+
+def resolve_aggregate(root, info):
+    get_queryset = getattr(root, "aggregate_queryset", None)
+    if get_queryset is None:
+        return None
+    queryset = get_queryset()
+    facets = get_aggregate_facets(info, queryset._document)
+    if getattr(root, "aggregate_executor", None) == ExecutorEnum.ASYNC:
+        return sync_to_async(run_aggregate)(queryset, facets)
+    return run_aggregate(queryset, facets)
@@ -0,0 +1,168 @@
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
+# Defaults of the shared count cache, see `count_cache` on MongoengineConnectionField
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_SIZE = 1024
+# Defaults of the shared page cache, see `page_cache` on MongoengineConnectionField
+PAGE_CACHE_TTL = 60
+PAGE_CACHE_SIZE = 256
+# Lifetime of the page versions of a collection, longer than the pages keyed by them
+PAGE_VERSION_TTL = 24 * 3600
+
+
+class TTLCache:
+    """
+    Thread-safe mapping whose entries expire `ttl` seconds after they are set
+
+    Args:
+        ttl (float): lifetime of the entries, in seconds
+        maxsize (int): evicts the least recently used entries past this size,
+            unbounded by default
+        clock (callable): returns the current time in seconds, time.monotonic by default
+    """
+
+    def __init__(self, ttl, maxsize=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (value, self.clock() + (self.ttl if ttl is None else ttl))
+            self.entries.move_to_end(key)
+            while self.maxsize is not None and len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def get_or_set(self, key, get_value):
+        """Returns the cached value of `key`, else caches and returns `get_value()`"""
+        value = self.get(key)
+        if value is None:
+            value = get_value()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate_matching(self, predicate):
+        """Drops the entries whose key satisfies `predicate`"""
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class CacheBackend:
+    """
+    Store of the page cache, mapping string keys to bytes. Shared stores, e.g. Redis,
+    are plugged in by implementing `get` and `set` over their client.
+    """
+
+    def get(self, key):
+        """Returns the value stored for `key`, None when missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Stores `value` for `key` during `ttl` seconds"""
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process backend, evicting the least recently used entries past `maxsize`"""
+
+    def __init__(self, maxsize=PAGE_CACHE_SIZE, clock=time.monotonic):
+        self.cache = TTLCache(PAGE_CACHE_TTL, maxsize=maxsize, clock=clock)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, ttl)
+
+
+default_count_cache = TTLCache(COUNT_CACHE_TTL, maxsize=COUNT_CACHE_SIZE)
+
+default_page_cache = LocalCacheBackend()
+
+# Caches counts were cached in, see invalidate_counts
+count_caches = weakref.WeakSet([default_count_cache])
+
+# Backends pages were cached in, see invalidate_pages
+page_cache_backends = weakref.WeakSet()
+
+
+def invalidate_counts(model, cache=None):
+    """
+    Drops the cached counts of `model` and of the models sharing its collection, to be
+    called after writing to it. The mutations of graphene-mongo call it themselves.
+
+    Args:
+        model (mongoengine.Document):
+        cache (TTLCache): every cache counts were cached in by default
+    """
+    collection_name = model._get_collection_name()
+    for each in [cache] if cache is not None else list(count_caches):
+        each.invalidate_matching(lambda key: key[0]._get_collection_name() == collection_name)
+
+
+def get_page_version(model, backend):
+    """
+    Token part of the keys of the pages of `model` cached in `backend`, replaced by
+    invalidate_pages. A missing token, e.g. evicted, is replaced too so that pages keyed
+    by the previous one are never served again.
+    """
+    page_cache_backends.add(backend)
+    key = "graphene-mongo:page-version:{}".format(model._get_collection_name())
+    version = backend.get(key)
+    if version is None:
+        version = uuid.uuid4().hex.encode("ascii")
+        backend.set(key, version, PAGE_VERSION_TTL)
+    return version
+
+
+def invalidate_pages(model, backend=None):
+    """
+    Drops the cached pages of `model` and of the models sharing its collection, to be
+    called after writing to it. The mutations of graphene-mongo call it themselves.
+
+    Args:
+        model (mongoengine.Document):
+        backend (CacheBackend): every backend pages were cached in by default
+    """
+    key = "graphene-mongo:page-version:{}".format(model._get_collection_name())
+    for each in [backend] if backend is not None else list(page_cache_backends):
+        each.set(key, uuid.uuid4().hex.encode("ascii"), PAGE_VERSION_TTL)
@@ -1,3 +1,4 @@
+import copy
 import sys
 
 import graphene
@@ -152,7 +153,7 @@ def convert_file_to_field(field, registry=None, executor: ExecutorEnum = Executo
 @convert_mongoengine_field.register(mongoengine.EmbeddedDocumentListField)
 @convert_mongoengine_field.register(mongoengine.GeoPointField)
 def convert_field_to_list(field, registry=None, executor: ExecutorEnum = ExecutorEnum.SYNC):
-    base_type = convert_mongoengine_field(field.field, registry=registry, executor=executor)
+    base_type = convert_mongoengine_field_cached(field.field, registry=registry, executor=executor)
     if isinstance(base_type, graphene.Field):
         if isinstance(field.field, mongoengine.GenericReferenceField):
             return graphene.List(
@@ -232,8 +233,7 @@ def convert_field_to_union(field, registry=None, executor: ExecutorEnum = Execut
             field_name,
         )
     )
-    Meta = type("Meta", (object,), {"types": tuple(_types)})
-    _union = type(name, (graphene.Union,), {"Meta": Meta})
+    _union = registry.get_union_type(name, tuple(_types))
 
     if isinstance(field, mongoengine.GenericReferenceField) or isinstance(
         field, mongoengine.GenericLazyReferenceField
@@ -353,6 +353,39 @@ def convert_lazy_field_to_dynamic(field, registry=None, executor: ExecutorEnum =
     return graphene.Dynamic(dynamic_type)
 
 
+def copy_converted_field(converted):
+    """
+    Copy of a memoized conversion, ordered as if just created so that every type mounting
+    it keeps the field order of its model, and mutable on its own
+    """
+    converted = copy.copy(converted)
+    # e.g. the args of Field or the kwargs of unmounted types, not computed properties
+    for name, value in list(vars(converted).items()):
+        if isinstance(value, dict):
+            setattr(converted, name, copy.copy(value))
+    converted.reset_counter()
+    return converted
+
+
+def convert_mongoengine_field_cached(
+    field, registry=None, executor: ExecutorEnum = ExecutorEnum.SYNC
+):
+    """
+    Same as convert_mongoengine_field, conversions being memoized by the registry per
+    field and executor and handed out as copies.
+    """
+    if registry is None:
+        return convert_mongoengine_field(field, registry, executor)
+    converted = registry.get_converted_field(field, executor)
+    if converted is None:
+        converted = convert_mongoengine_field(field, registry, executor)
+        # None may be converted later on, once the types it needs are registered
+        if converted is None:
+            return None
+        registry.register_converted_field(field, converted, executor)
+    return copy_converted_field(converted)
+
+
 if sys.version_info >= (3, 6):
 
     @convert_mongoengine_field.register(mongoengine.EnumField)
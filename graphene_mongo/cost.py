@@ -0,0 +1,221 @@
+from typing import Callable, Dict, Optional
+
+import mongoengine
+from graphene.utils.str_converters import to_snake_case
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    IntValueNode,
+    OperationDefinitionNode,
+    get_named_type,
+    is_list_type,
+    is_wrapping_type,
+)
+from graphql.validation import ValidationContext, ValidationRule
+
+from .fields import MongoengineConnectionField
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_LIST_SIZE = 10
+
+REFERENCE_FIELDS = (
+    mongoengine.ReferenceField,
+    mongoengine.LazyReferenceField,
+    mongoengine.CachedReferenceField,
+    mongoengine.GenericReferenceField,
+    mongoengine.GenericLazyReferenceField,
+)
+
+
+class QueryCost:
+    def __init__(self, documents=0, round_trips=0):
+        self.documents = documents
+        self.round_trips = round_trips
+
+    def __repr__(self):
+        return "QueryCost(documents={}, round_trips={})".format(self.documents, self.round_trips)
+
+
+class QueryCostEstimator:
+    """
+    Estimates the documents fetched and the queries issued by an operation
+
+    Every MongoengineConnectionField multiplies the documents fetched below it by its
+    page size (`first`/`last`, capped by the field's `max_limit`, else `max_limit`,
+    else `default_page_size` for fields with `max_limit=0`), every reference field costs one fetch per parent
+    document and other lists are assumed to hold `list_size` items.
+    """
+
+    def __init__(
+        self,
+        schema,
+        fragments,
+        default_page_size=DEFAULT_PAGE_SIZE,
+        list_size=DEFAULT_LIST_SIZE,
+    ):
+        self.schema = schema
+        self.fragments = fragments
+        self.default_page_size = default_page_size
+        self.list_size = list_size
+
+    def estimate(self, operation: OperationDefinitionNode) -> QueryCost:
+        cost = QueryCost()
+        root_type = self.schema.get_root_type(operation.operation)
+        if root_type is not None:
+            self.visit_selections(operation, root_type, 1, cost)
+        return cost
+
+    def get_page_size(self, node: FieldNode, field: MongoengineConnectionField):
+        max_limit = field.max_limit
+        for argument in node.arguments or ():
+            if argument.name.value in ("first", "last") and isinstance(
+                argument.value, IntValueNode
+            ):
+                page_size = int(argument.value.value)
+                return page_size if max_limit is None else min(page_size, max_limit)
+        return self.default_page_size if max_limit is None else max_limit
+
+    def iter_fields(self, node, parent_type):
+        """Yields the fields selected on `node`, fragments flattened, with their parent type"""
+        if node.selection_set is None:
+            return
+        for selection in node.selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+                continue
+            if isinstance(selection, FragmentSpreadNode):
+                selection = self.fragments.get(selection.name.value)
+                if selection is None:
+                    continue
+            _type = parent_type
+            if selection.type_condition is not None:
+                _type = self.schema.get_type(selection.type_condition.name.value) or _type
+            yield from self.iter_fields(selection, _type)
+
+    def visit_selections(self, node, parent_type, multiplier, cost):
+        for field_node, _type in self.iter_fields(node, parent_type):
+            self.visit_field(field_node, _type, multiplier, cost)
+
+    def visit_connection(self, node, connection_type, multiplier, cost):
+        for edges_node, _type in self.iter_fields(node, connection_type):
+            if edges_node.name.value != "edges":
+                continue
+            edge_type = get_named_type(_type.fields["edges"].type)
+            for node_node, _edge_type in self.iter_fields(edges_node, edge_type):
+                if node_node.name.value == "node":
+                    node_type = get_named_type(_edge_type.fields["node"].type)
+                    self.visit_selections(node_node, node_type, multiplier, cost)
+
+    def visit_field(self, node: FieldNode, parent_type, multiplier, cost):
+        field_name = node.name.value
+        if field_name.startswith("__") or not hasattr(parent_type, "fields"):
+            return
+        graphql_field = parent_type.fields.get(field_name)
+        if graphql_field is None:
+            return
+
+        is_list = False
+        _type = graphql_field.type
+        while is_wrapping_type(_type):
+            is_list = is_list or is_list_type(_type)
+            _type = _type.of_type
+        field_type = get_named_type(graphql_field.type)
+
+        parent_meta = getattr(getattr(parent_type, "graphene_type", None), "_meta", None)
+        graphene_fields = getattr(parent_meta, "fields", None) or {}
+        graphene_field = graphene_fields.get(field_name) or graphene_fields.get(
+            to_snake_case(field_name)
+        )
+        model = getattr(parent_meta, "model", None)
+        model_field = model._fields.get(to_snake_case(field_name)) if model else None
+        field_type_meta = getattr(getattr(field_type, "graphene_type", None), "_meta", None)
+
+        if isinstance(graphene_field, MongoengineConnectionField):
+            documents = multiplier * self.get_page_size(node, graphene_field)
+            if issubclass(graphene_field.model, mongoengine.Document):
+                cost.documents += documents
+                cost.round_trips += multiplier
+            self.visit_connection(node, field_type, documents, cost)
+            return
+        if isinstance(model_field, REFERENCE_FIELDS):
+            cost.documents += multiplier
+            cost.round_trips += multiplier
+        elif model_field is not None and isinstance(
+            getattr(model_field, "field", None), REFERENCE_FIELDS
+        ):
+            cost.documents += multiplier * self.list_size
+            cost.round_trips += multiplier
+            multiplier = multiplier * self.list_size
+        elif model is None and getattr(field_type_meta, "model", None) is not None:
+            # A custom resolver returning mongoengine documents
+            documents = multiplier * (self.list_size if is_list else 1)
+            cost.documents += documents
+            cost.round_trips += multiplier
+            multiplier = documents
+        elif is_list:
+            multiplier = multiplier * self.list_size
+
+        self.visit_selections(node, field_type, multiplier, cost)
+
+
+def cost_limit_validator(
+    max_documents: Optional[int] = None,
+    max_round_trips: Optional[int] = None,
+    default_page_size: int = DEFAULT_PAGE_SIZE,
+    list_size: int = DEFAULT_LIST_SIZE,
+    callback: Optional[Callable[[Dict[str, QueryCost]], None]] = None,
+):
+    """
+    Builds a validation rule rejecting operations whose estimated cost is over budget
+
+    Args:
+        max_documents (int): maximum number of documents an operation may fetch
+        max_round_trips (int): maximum number of queries an operation may issue
+        default_page_size (int): page size assumed when no first/last is given
+        list_size (int): size assumed for lists
+        callback (callable): called with the QueryCost of every operation, by name
+
+    Returns:
+        ValidationRule: to be passed to graphql.validate
+    """
+
+    class CostLimitValidator(ValidationRule):
+        def __init__(self, validation_context: ValidationContext):
+            super().__init__(validation_context)
+            fragments = {}
+            operations = []
+            for definition in validation_context.document.definitions:
+                if isinstance(definition, FragmentDefinitionNode):
+                    fragments[definition.name.value] = definition
+                elif isinstance(definition, OperationDefinitionNode):
+                    operations.append(definition)
+
+            estimator = QueryCostEstimator(
+                validation_context.schema, fragments, default_page_size, list_size
+            )
+            costs = {}
+            for operation in operations:
+                name = operation.name.value if operation.name else "anonymous"
+                cost = costs[name] = estimator.estimate(operation)
+                if max_documents is not None and cost.documents > max_documents:
+                    validation_context.report_error(
+                        GraphQLError(
+                            "'{}' exceeds maximum query cost: it may fetch {} documents, "
+                            "the limit is {}.".format(name, cost.documents, max_documents),
+                            [operation],
+                        )
+                    )
+                if max_round_trips is not None and cost.round_trips > max_round_trips:
+                    validation_context.report_error(
+                        GraphQLError(
+                            "'{}' exceeds maximum query cost: it may issue {} queries, "
+                            "the limit is {}.".format(name, cost.round_trips, max_round_trips),
+                            [operation],
+                        )
+                    )
+            if callable(callback):
+                callback(costs)
+
+    return CostLimitValidator
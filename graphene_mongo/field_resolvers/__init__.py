@@ -1,9 +1,11 @@
+from .data_field_resolver import DataFieldResolver
 from .dynamic_lazy_field_resolver import DynamicLazyFieldResolver
 from .dynamic_reference_field_resolver import DynamicReferenceFieldResolver
 from .list_field_resolver import ListFieldResolver
 from .union_resolver import UnionFieldResolver
 
 __all__ = [
+    "DataFieldResolver",
     "DynamicLazyFieldResolver",
     "DynamicReferenceFieldResolver",
     "ListFieldResolver",
@@ -0,0 +1,16 @@
+from graphene.types.resolver import dict_or_attr_resolver
+
+
+class DataFieldResolver:
+    @staticmethod
+    def data_resolver(name):
+        """Reads a plain field straight from the document's `_data`, skipping its descriptor"""
+
+        def resolver(root, info, **args):
+            try:
+                return root._data.get(name)
+            except AttributeError:
+                # Not a mongoengine document, e.g. a dict or an ObjectType instance
+                return dict_or_attr_resolver(name, None, root, info, **args)
+
+        return resolver
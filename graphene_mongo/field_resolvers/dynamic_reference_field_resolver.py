@@ -5,8 +5,14 @@ from bson import ObjectId
 from graphene.utils.str_converters import to_snake_case
 from graphene_mongo.utils import (
     ExecutorEnum,
+    get_model_max_time_ms,
+    get_model_read_preference,
+    get_model_router,
     get_query_fields,
+    get_routed_queryset,
     sync_to_async,
+    with_max_time_ms,
+    with_read_preference,
 )
 from mongoengine import Document, ReferenceField
 
@@ -54,7 +60,17 @@ class DynamicReferenceFieldResolver:
             if not isinstance(result, tuple):
                 return result
             document, only_fields, pk = result
-            return document.objects.no_dereference().only(*only_fields).get(pk=pk)
+            return with_max_time_ms(
+                with_read_preference(
+                    get_routed_queryset(
+                        args[0], document, get_model_router(args[0], registry, document, executor)
+                    )
+                    .no_dereference()
+                    .only(*only_fields),
+                    get_model_read_preference(args[0], registry, document, executor),
+                ),
+                get_model_max_time_ms(args[0], registry, document, executor),
+            ).get(pk=pk)
 
         return resolver
 
@@ -67,8 +83,17 @@ class DynamicReferenceFieldResolver:
             if not isinstance(result, tuple):
                 return result
             document, only_fields, pk = result
-            return await sync_to_async(document.objects.no_dereference().only(*only_fields).get)(
-                pk=pk
+            queryset = with_max_time_ms(
+                with_read_preference(
+                    get_routed_queryset(
+                        args[0], document, get_model_router(args[0], registry, document, executor)
+                    )
+                    .no_dereference()
+                    .only(*only_fields),
+                    get_model_read_preference(args[0], registry, document, executor),
+                ),
+                get_model_max_time_ms(args[0], registry, document, executor),
             )
+            return await sync_to_async(queryset.get)(pk=pk)
 
         return resolver
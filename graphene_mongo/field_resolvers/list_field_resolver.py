@@ -2,16 +2,25 @@ import asyncio
 from asyncio import Future, Task
 from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from typing import Optional, Union
 
 from bson import ObjectId
 from graphene.utils.str_converters import to_snake_case
 from graphene_mongo.utils import (
     ExecutorEnum,
+    deadline_exceeded,
+    gather_with_deadline,
+    get_max_time_ms,
+    get_model_max_time_ms,
+    get_model_read_preference,
+    get_model_router,
     get_queried_union_types,
+    get_routed_queryset,
     sync_to_async,
+    with_max_time_ms,
+    with_read_preference,
 )
-import mongoengine
 from mongoengine import Document
 from mongoengine.base import LazyReference, get_document
 
@@ -25,12 +34,8 @@ class ListFieldResolver:
         object_id_list: list[ObjectId],
         queried_fields: dict,
     ) -> tuple[Document, set[str], list[ObjectId]]:
-        from graphene_mongo.converter import convert_mongoengine_field
-
         document = get_document(model)
-        document_field = mongoengine.ReferenceField(document)
-        document_field = convert_mongoengine_field(document_field, registry, executor)
-        document_field_type = document_field.get_type().type
+        document_field_type = registry.get_type_for_model(document, executor=executor)
         _queried_fields = list()
         filter_args = list()
         if document_field_type._meta.filter_fields:
@@ -53,11 +58,22 @@ class ListFieldResolver:
         executor: ExecutorEnum,
         object_id_list: list[ObjectId],
         queried_fields: dict,
+        max_time_ms: Optional[int] = None,
+        read_preference=None,
+        queryset=None,
     ):
         document, only_fields, document_ids = ListFieldResolver.__get_reference_objects_common(
             registry, model, executor, object_id_list, queried_fields
         )
-        return document.objects().no_dereference().only(*only_fields).filter(pk__in=document_ids)
+        return with_max_time_ms(
+            with_read_preference(
+                (document.objects if queryset is None else queryset)
+                .no_dereference()
+                .only(*only_fields),
+                read_preference,
+            ),
+            max_time_ms,
+        ).filter(pk__in=document_ids)
 
     @staticmethod
     async def __get_reference_objects_async(
@@ -66,12 +82,23 @@ class ListFieldResolver:
         executor: ExecutorEnum,
         object_id_list: list[ObjectId],
         queried_fields: dict,
+        max_time_ms: Optional[int] = None,
+        read_preference=None,
+        queryset=None,
     ):
         document, only_fields, document_ids = ListFieldResolver.__get_reference_objects_common(
             registry, model, executor, object_id_list, queried_fields
         )
         return await sync_to_async(list)(
-            document.objects().no_dereference().only(*only_fields).filter(pk__in=document_ids)
+            with_max_time_ms(
+                with_read_preference(
+                    (document.objects if queryset is None else queryset)
+                    .no_dereference()
+                    .only(*only_fields),
+                    read_preference,
+                ),
+                max_time_ms,
+            ).filter(pk__in=document_ids)
         )
 
     # ======================= DB CALLS: END =======================
@@ -137,10 +164,30 @@ class ListFieldResolver:
             for model, object_id_list in choice_to_resolve.items():
                 if model in to_resolve_models:
                     queried_fields = to_resolve_models[model]
+                    max_time_ms = get_model_max_time_ms(
+                        args[0], registry, get_document(model), executor
+                    )
+                    read_preference = get_model_read_preference(
+                        args[0], registry, get_document(model), executor
+                    )
+                    queryset = get_routed_queryset(
+                        args[0],
+                        get_document(model),
+                        get_model_router(args[0], registry, get_document(model), executor),
+                    )
                     futures.append(
                         pool.submit(
                             ListFieldResolver.__get_reference_objects,
-                            *(registry, model, executor, object_id_list, queried_fields),
+                            *(
+                                registry,
+                                model,
+                                executor,
+                                object_id_list,
+                                queried_fields,
+                                max_time_ms,
+                                read_preference,
+                                queryset,
+                            ),
                         )
                     )
                 else:
@@ -150,7 +197,18 @@ class ListFieldResolver:
                             *(model, object_id_list),
                         )
                     )
-            result = [future.result() for future in as_completed(futures)]
+            max_time_ms = get_max_time_ms(args[0])
+            try:
+                result = [
+                    future.result()
+                    for future in as_completed(
+                        futures, timeout=None if max_time_ms is None else max_time_ms / 1000.0
+                    )
+                ]
+            except FuturesTimeoutError:
+                for future in futures:
+                    future.cancel()
+                raise deadline_exceeded()
             return result, to_resolve_object_ids
         else:
             loop = asyncio.get_event_loop()
@@ -158,9 +216,27 @@ class ListFieldResolver:
             for model, object_id_list in choice_to_resolve.items():
                 if model in to_resolve_models:
                     queried_fields = to_resolve_models[model]
+                    max_time_ms = get_model_max_time_ms(
+                        args[0], registry, get_document(model), executor
+                    )
+                    read_preference = get_model_read_preference(
+                        args[0], registry, get_document(model), executor
+                    )
+                    queryset = get_routed_queryset(
+                        args[0],
+                        get_document(model),
+                        get_model_router(args[0], registry, get_document(model), executor),
+                    )
                     task = loop.create_task(
                         ListFieldResolver.__get_reference_objects_async(
-                            registry, model, executor, object_id_list, queried_fields
+                            registry,
+                            model,
+                            executor,
+                            object_id_list,
+                            queried_fields,
+                            max_time_ms,
+                            read_preference,
+                            queryset,
                         )
                     )
                 else:
@@ -192,7 +268,7 @@ class ListFieldResolver:
             if not isinstance(resolver_result, tuple):
                 return resolver_result
             tasks, to_resolve_object_ids = resolver_result
-            result: list[Document] = await asyncio.gather(*tasks)
+            result: list[Document] = await gather_with_deadline(tasks, get_max_time_ms(args[0]))
             return ListFieldResolver.__build_results(result, to_resolve_object_ids)
 
         return resolver
@@ -5,8 +5,14 @@ from bson import ObjectId
 from graphene.utils.str_converters import to_snake_case
 from graphene_mongo.utils import (
     ExecutorEnum,
+    get_model_max_time_ms,
+    get_model_read_preference,
+    get_model_router,
     get_queried_union_types,
+    get_routed_queryset,
     sync_to_async,
+    with_max_time_ms,
+    with_read_preference,
 )
 import mongoengine
 from mongoengine import Document
@@ -18,17 +24,13 @@ class UnionFieldResolver:
     def __reference_resolver_common(
         field, registry, executor: ExecutorEnum, root, *args, **kwargs
     ) -> Optional[Union[tuple[Document, set[str], ObjectId], Document]]:
-        from graphene_mongo.converter import convert_mongoengine_field
-
         de_referenced = getattr(root, field.name or field.db_name)
         if not de_referenced:
             return None
 
         document = get_document(de_referenced["_cls"])
         document_id = de_referenced["_ref"].id
-        document_field = mongoengine.ReferenceField(document)
-        document_field = convert_mongoengine_field(document_field, registry, executor=executor)
-        _type = document_field.get_type().type
+        _type = registry.get_type_for_model(document, executor=executor)
         filter_args = list()
         if _type._meta.filter_fields:
             for key, values in _type._meta.filter_fields.items():
@@ -104,7 +106,17 @@ class UnionFieldResolver:
             if not isinstance(result, tuple):
                 return result
             document, only_fields, pk = result
-            return document.objects.no_dereference().only(*only_fields).get(pk=pk)
+            return with_max_time_ms(
+                with_read_preference(
+                    get_routed_queryset(
+                        args[0], document, get_model_router(args[0], registry, document, executor)
+                    )
+                    .no_dereference()
+                    .only(*only_fields),
+                    get_model_read_preference(args[0], registry, document, executor),
+                ),
+                get_model_max_time_ms(args[0], registry, document, executor),
+            ).get(pk=pk)
 
         return resolver
 
@@ -120,8 +132,17 @@ class UnionFieldResolver:
             if not isinstance(result, tuple):
                 return result
             document, only_fields, pk = result
-            return await sync_to_async(document.objects.no_dereference().only(*only_fields).get)(
-                pk=pk
+            queryset = with_max_time_ms(
+                with_read_preference(
+                    get_routed_queryset(
+                        args[0], document, get_model_router(args[0], registry, document, executor)
+                    )
+                    .no_dereference()
+                    .only(*only_fields),
+                    get_model_read_preference(args[0], registry, document, executor),
+                ),
+                get_model_max_time_ms(args[0], registry, document, executor),
             )
+            return await sync_to_async(queryset.get)(pk=pk)
 
         return resolver
@@ -1,15 +1,16 @@
 from __future__ import absolute_import
 
+import hashlib
+import json
 import logging
 from collections import OrderedDict
 from functools import partial, reduce
-from itertools import filterfalse
 
 import bson
 import graphene
 import mongoengine
 import pymongo
-from bson import DBRef, ObjectId
+from bson import DBRef, ObjectId, json_util
 from graphene import Context
 from graphene.relay import ConnectionField
 from graphene.types.argument import to_arguments
@@ -22,28 +23,248 @@ from graphql_relay import cursor_to_offset, from_global_id
 from mongoengine import QuerySet
 from mongoengine.base import get_document
 from promise import Promise
-from pymongo.errors import OperationFailure
+from pymongo.errors import ExecutionTimeout, OperationFailure
 
 from .advanced_types import (
     FileFieldType,
+    GridFSFileLoader,
     MultiPolygonFieldType,
     PointFieldInputType,
     PointFieldType,
+    PolygonFieldInputType,
     PolygonFieldType,
 )
-from .converter import MongoEngineConversionError, convert_mongoengine_field
+from .cache import (
+    PAGE_CACHE_TTL,
+    TTLCache,
+    count_caches,
+    default_count_cache,
+    default_page_cache,
+    get_page_version,
+)
+from .converter import MongoEngineConversionError, convert_mongoengine_field_cached
+from .filters import compile_filter, get_filter_input_type
 from .registry import get_global_registry
+from .snapshot import get_snapshot_args, record_args
 from .utils import (
+    DEFAULT_MAX_LIMIT,
     ExecutorEnum,
     connection_from_iterables,
+    count_by_ids,
+    fetch_page,
+    find_index_for_query,
     find_skip_and_limit,
+    get_filter_key_sets,
+    get_max_time_ms,
     get_model_reference_fields,
     get_query_fields,
+    get_read_preference,
+    get_routed_collection,
+    get_routed_queryset,
+    get_router,
     has_page_info,
+    with_max_time_ms,
+    with_read_preference,
 )
 
 PYMONGO_VERSION = tuple(pymongo.version_tuple[:2])
 
+INDEX_POLICIES = ("warn", "raise")
+
+DEFAULT_MAX_DISTANCE = 10000
+
+# Collection totals read from the collection metadata, see `estimated_count`
+ESTIMATED_COUNT_TTL = 10
+estimated_counts = TTLCache(ESTIMATED_COUNT_TTL)
+
+# Geo operators served by `$geoWithin`/`$geoIntersects`, which can be counted
+GEO_FILTER_OPERATORS = ("within_box", "within_polygon", "geo_within", "geo_intersects")
+GEO_NEAR_OPERATORS = ("near", "near_sphere")
+
+GEO_FILTER_TYPES = {
+    "PointFieldType": {
+        "near": PointFieldInputType,
+        "near_sphere": PointFieldInputType,
+        "max_distance": graphene.Int,
+        "min_distance": graphene.Int,
+        "within_box": graphene.List(graphene.List(graphene.Float)),
+        "within_polygon": PolygonFieldInputType,
+        "geo_within": PolygonFieldInputType,
+        "geo_intersects": PolygonFieldInputType,
+    },
+    "PolygonFieldType": {
+        "geo_within": PolygonFieldInputType,
+        "geo_intersects": PointFieldInputType,
+    },
+    "MultiPolygonFieldType": {
+        "geo_within": PolygonFieldInputType,
+        "geo_intersects": PointFieldInputType,
+    },
+}
+
+
+class UnindexedQueryError(Exception):
+    pass
+
+
+def _decode_reference_id(value):
+    if isinstance(value, ObjectId):
+        return value
+    _from_global_id = from_global_id(value)[1]
+    if bson.objectid.ObjectId.is_valid(_from_global_id):
+        return ObjectId(_from_global_id)
+    return _from_global_id
+
+
+def _enum_value(value):
+    if getattr(value, "value", None):
+        return value.value
+    return value
+
+
+def _identity(value):
+    return value
+
+
+def _hydrate_reference(document_type, arg_name, arg, args):
+    if isinstance(arg, mongoengine.base.metaclasses.TopLevelDocumentMetaclass):
+        return {}
+    try:
+        return {arg_name: document_type(pk=from_global_id(arg)[1])}
+    except TypeError:
+        return {arg_name: document_type(pk=arg)}
+
+
+def _hydrate_generic_reference(registry, arg_name, arg, args):
+    try:
+        reference_obj = get_document(registry._registry_string_map[from_global_id(arg)[0]])(
+            pk=from_global_id(arg)[1]
+        )
+    except TypeError:
+        reference_obj = get_document(arg["_cls"])(pk=arg["_ref"].id)
+    return {arg_name: reference_obj}
+
+
+def _hydrate_near(field_name, arg_name, arg, args):
+    location = args.pop(arg_name, None)
+    hydrated = {arg_name: location["coordinates"]}
+    if (field_name + "__max_distance") not in args:
+        hydrated[field_name + "__max_distance"] = DEFAULT_MAX_DISTANCE
+    return hydrated
+
+
+def _hydrate_geometry(field_name, arg_name, arg, args):
+    """`within_polygon`, `geo_within` and `geo_intersects` as a GeoJSON geometry"""
+    args.pop(arg_name, None)
+    operator = "geo_intersects" if arg_name.endswith("__geo_intersects") else "geo_within"
+    return {
+        "{}__{}".format(field_name, operator): {
+            "type": arg["type"],
+            "coordinates": arg["coordinates"],
+        }
+    }
+
+
+def _hydrate_within_box(field_name, arg_name, arg, args):
+    """`within_box` as a GeoJSON polygon, `$box` is not served by 2dsphere indexes"""
+    args.pop(arg_name, None)
+    if len(arg) != 2 or any(len(corner) != 2 for corner in arg):
+        raise ValueError("`{}` expects the bottom left and top right corners".format(arg_name))
+    (x1, y1), (x2, y2) = arg
+    return {
+        field_name + "__geo_within": {
+            "type": "Polygon",
+            "coordinates": [[[x1, y1], [x2, y1], [x2, y2], [x1, y2], [x1, y1]]],
+        }
+    }
+
+
+def _hydrate_global_id(arg_name, arg, args):
+    return {"id": from_global_id(args.pop("id", None))[1]}
+
+
+class ArgumentPlan:
+    """
+    Lookup tables built once per connection field from the model and the type's Meta.
+
+    Resolving a request is then a flat dict dispatch over its arguments instead of
+    isinstance checks against the model fields.
+
+    Attributes:
+        filterable_args (frozenset): arguments forwarded to get_queryset by the
+            chained resolver
+        resolved_args (frozenset): arguments kept when re-filtering a resolved queryset
+        count_coercers (dict): argument name to the function preparing its value for
+            count_documents; arguments without one are not part of the count filter
+        queryset_coercers (dict): argument name to the function hydrating it for
+            get_queryset, returning the arguments to update
+        file_fields (tuple): GridFS fields whose files are primed for each page
+        geo_filter_args (frozenset): `$geoWithin`/`$geoIntersects` filter arguments, also
+            applied to counts
+    """
+
+    def __init__(self, field):
+        model = field.model
+        meta = field._type._meta
+        filter_args = tuple(field.filter_args.keys())
+        excluded = set(meta.non_filter_fields or ()) | {
+            name
+            for name, _field in field.fields.items()
+            if isinstance(_field, MongoengineConnectionField)
+        }
+        self.filterable_args = frozenset(
+            name for name in model._fields_ordered if name not in excluded
+        ) | frozenset(filter_args + ("order_by", "where"))
+        self.resolved_args = frozenset(
+            model._fields_ordered
+            + ("first", "last", "before", "after", "order_by", "where")
+            + filter_args
+        )
+
+        self.file_fields = tuple(
+            name
+            for name in model._fields_ordered
+            if isinstance(model._fields.get(name), mongoengine.fields.FileField)
+        )
+        self.count_coercers = {}
+        self.queryset_coercers = {"id": _hydrate_global_id}
+        reference_fields = get_model_reference_fields(model)
+        for name in model._fields_ordered:
+            model_field = model._fields.get(name)
+            if isinstance(
+                model_field,
+                (
+                    mongoengine.fields.ReferenceField,
+                    mongoengine.fields.GenericReferenceField,
+                    mongoengine.fields.LazyReferenceField,
+                    mongoengine.fields.CachedReferenceField,
+                ),
+            ):
+                self.count_coercers[name] = _decode_reference_id
+            elif isinstance(model_field, mongoengine.fields.EnumField):
+                self.count_coercers[name] = _enum_value
+            else:
+                self.count_coercers[name] = _identity
+
+            if name in reference_fields:
+                self.queryset_coercers[name] = partial(
+                    _hydrate_reference, reference_fields[name].document_type
+                )
+            elif isinstance(model_field, mongoengine.fields.GenericReferenceField):
+                self.queryset_coercers[name] = partial(_hydrate_generic_reference, field.registry)
+            elif isinstance(model_field, mongoengine.fields.PointField):
+                for operator in GEO_NEAR_OPERATORS:
+                    self.queryset_coercers[name + "__" + operator] = partial(_hydrate_near, name)
+                self.queryset_coercers[name + "__within_box"] = partial(_hydrate_within_box, name)
+            if isinstance(model_field, mongoengine.fields.GeoJsonBaseField):
+                for operator in ("within_polygon", "geo_within", "geo_intersects"):
+                    self.queryset_coercers[name + "__" + operator] = partial(
+                        _hydrate_geometry, name
+                    )
+        self.geo_filter_args = frozenset(
+            name for name in filter_args if name.rsplit("__", 1)[-1] in GEO_FILTER_OPERATORS
+        )
+
 
 class MongoengineConnectionField(ConnectionField):
     def __init__(self, type, *args, **kwargs):
@@ -53,6 +274,23 @@ class MongoengineConnectionField(ConnectionField):
                 "Attribute `get_queryset` on {} must be callable.".format(self)
             )
         self._get_queryset = get_queryset
+        index_policy = kwargs.pop("index_policy", None)
+        assert index_policy is None or index_policy in INDEX_POLICIES, (
+            "Attribute `index_policy` on {} must be one of {}.".format(self, INDEX_POLICIES)
+        )
+        self._index_policy = index_policy
+        self._index_hint = kwargs.pop("index_hint", None)
+        self._max_time_ms = kwargs.pop("max_time_ms", None)
+        self._read_preference = kwargs.pop("read_preference", None)
+        self._router = kwargs.pop("router", None)
+        self._estimated_count = kwargs.pop("estimated_count", None)
+        self._count_cache = kwargs.pop("count_cache", None)
+        self._page_cache = kwargs.pop("page_cache", None)
+        self._page_cache_ttl = kwargs.pop("page_cache_ttl", None)
+        self._page_cache_key = kwargs.pop("page_cache_key", None)
+        self._max_limit = kwargs.pop("max_limit", None)
+        self._distance_field = kwargs.pop("distance_field", None)
+        self._argument_plan = None
         super(MongoengineConnectionField, self).__init__(type, *args, **kwargs)
 
     @property
@@ -84,6 +322,154 @@ class MongoengineConnectionField(ConnectionField):
     def order_by(self):
         return self.node_type._meta.order_by
 
+    @property
+    def indexes(self):
+        return getattr(self.node_type._meta, "indexes", ())
+
+    @property
+    def index_policy(self):
+        if self._index_policy is not None:
+            return self._index_policy
+        return getattr(self.node_type._meta, "index_policy", None)
+
+    @property
+    def index_hint(self):
+        if self._index_hint is not None:
+            return self._index_hint
+        return getattr(self.node_type._meta, "index_hint", False)
+
+    @property
+    def max_time_ms(self):
+        if self._max_time_ms is not None:
+            return self._max_time_ms
+        return getattr(self.node_type._meta, "max_time_ms", None)
+
+    def get_max_time_ms(self, info):
+        return get_max_time_ms(info, self.max_time_ms)
+
+    @property
+    def read_preference(self):
+        if self._read_preference is not None:
+            return self._read_preference
+        return getattr(self.node_type._meta, "read_preference", None)
+
+    def get_read_preference(self, info):
+        return get_read_preference(info, self.read_preference)
+
+    @property
+    def router(self):
+        if self._router is not None:
+            return self._router
+        return getattr(self.node_type._meta, "router", None)
+
+    def get_objects(self, info, model=None):
+        """`model.objects`, the field's model by default, routed for `info`"""
+        return get_routed_queryset(info, model or self.model, self.router)
+
+    @property
+    def estimated_count(self):
+        if self._estimated_count is not None:
+            return self._estimated_count
+        return getattr(self.node_type._meta, "estimated_count", False)
+
+    @property
+    def count_cache(self):
+        """The TTLCache counts are cached in, None when they aren't"""
+        count_cache = self._count_cache
+        if count_cache is None:
+            count_cache = getattr(self.node_type._meta, "count_cache", None)
+        if count_cache is True:
+            return default_count_cache
+        return count_cache if isinstance(count_cache, TTLCache) else None
+
+    @property
+    def page_cache(self):
+        """The CacheBackend connection pages are cached in, None when they aren't"""
+        page_cache = self._page_cache
+        if page_cache is None:
+            page_cache = getattr(self.node_type._meta, "page_cache", None)
+        if page_cache is True:
+            return default_page_cache
+        return None if page_cache is False else page_cache
+
+    @property
+    def page_cache_ttl(self):
+        if self._page_cache_ttl is not None:
+            return self._page_cache_ttl
+        return getattr(self.node_type._meta, "page_cache_ttl", None) or PAGE_CACHE_TTL
+
+    @property
+    def page_cache_key(self):
+        if self._page_cache_key is not None:
+            return self._page_cache_key
+        return getattr(self.node_type._meta, "page_cache_key", None)
+
+    def get_page_key(self, info, required_fields, args, *pagination):
+        """
+        Key of the page selected by `args` and the `pagination` arguments, None when
+        pages aren't cached. Besides the arguments, the key covers the field, the
+        routing, the fields fetched and `page_cache_key(info)` when given.
+
+        Fields with a `get_queryset`, which usually filters by user, are only cached
+        with a `page_cache_key` telling their requests apart.
+        """
+        page_cache = self.page_cache
+        if page_cache is None or (self.distance_field and self.get_near_arg(args)):
+            return None
+        page_cache_key = self.page_cache_key
+        if self._get_queryset and page_cache_key is None:
+            return None
+        parent_type = getattr(info, "parent_type", None)
+        payload = json.dumps(
+            [
+                getattr(parent_type, "name", None),
+                getattr(info, "field_name", None),
+                get_router(info, self.router)(self.model, info),
+                None if page_cache_key is None else page_cache_key(info),
+                get_page_version(self.model, page_cache),
+                args,
+                pagination,
+                sorted(set(required_fields)),
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return "graphene-mongo:page:{}:{}".format(
+            self.model._class_name, hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        )
+
+    def get_cached_page(self, page_key):
+        """Returns the documents, skip and has_next_page of a cached page, None on a miss"""
+        value = self.page_cache.get(page_key)
+        if value is None:
+            return None
+        page = bson.decode(value)
+        documents = [self.model._from_son(son) for son in page["documents"]]
+        return documents, page["skip"], page["has_next_page"]
+
+    def cache_page(self, page_key, documents, skip, has_next_page):
+        page = {
+            "documents": [document.to_mongo() for document in documents],
+            "skip": skip or 0,
+            "has_next_page": has_next_page,
+        }
+        self.page_cache.set(page_key, bson.encode(page), self.page_cache_ttl)
+
+    @property
+    def max_limit(self):
+        """Most records returned at once, None when `max_limit=0` lifts the cap"""
+        max_limit = self._max_limit
+        if max_limit is None:
+            max_limit = getattr(self.node_type._meta, "max_limit", None)
+        if max_limit is None:
+            return DEFAULT_MAX_LIMIT
+        return max_limit or None
+
+    @property
+    def distance_field(self):
+        """Attribute receiving the distance when `near` queries run as `$geoNear`"""
+        return self._distance_field
+
     @property
     def required_fields(self):
         return tuple(set(self.node_type._meta.required_fields + self.node_type._meta.only_fields))
@@ -98,6 +484,8 @@ class MongoengineConnectionField(ConnectionField):
         _advance_args = self.advance_args
         _filter_args = self.filter_args
         _extended_args = self.extended_args
+        _order_by_args = self.order_by_args
+        _where_args = self.where_args
         if self._type._meta.non_filter_fields:
             for _field in self._type._meta.non_filter_fields:
                 if _field in _field_args:
@@ -108,9 +496,12 @@ class MongoengineConnectionField(ConnectionField):
                     _filter_args.pop(_field)
                 if _field in _extended_args:
                     _filter_args.pop(_field)
+        record_args(self.node_type, self.fields, _field_args, _advance_args)
         extra_args = dict(
             dict(dict(_field_args, **_advance_args), **_filter_args), **_extended_args
         )
+        extra_args.update(_order_by_args)
+        extra_args.update(_where_args)
 
         for key in list(self._base_args.keys()):
             extra_args.pop(key, None)
@@ -120,7 +511,7 @@ class MongoengineConnectionField(ConnectionField):
     def args(self, args):
         self._base_args = args
 
-    def _field_args(self, items):
+    def _field_args(self, items, filterable=None):
         def is_filterable(k):
             """
             Remove complex columns from input args at this moment.
@@ -145,15 +536,18 @@ class MongoengineConnectionField(ConnectionField):
             if isinstance(getattr(self.model, k), property):
                 return False
             try:
-                converted = convert_mongoengine_field(
+                converted = convert_mongoengine_field_cached(
                     getattr(self.model, k), self.registry, self.executor
                 )
             except MongoEngineConversionError:
                 return False
             if isinstance(converted, (ConnectionField, Dynamic)):
                 return False
-            if callable(getattr(converted, "type", None)) and isinstance(
-                converted.type(),
+            converted_type = getattr(converted, "type", None)
+            while isinstance(converted_type, Structure):
+                converted_type = converted_type.of_type
+            if callable(converted_type) and isinstance(
+                converted_type(),
                 (
                     FileFieldType,
                     PointFieldType,
@@ -190,10 +584,15 @@ class MongoengineConnectionField(ConnectionField):
                 return get_filter_type(_type.of_type)
             return _type()
 
-        return {k: get_filter_type(v.type) for k, v in items if is_filterable(k)}
+        if filterable is None:
+            return {k: get_filter_type(v.type) for k, v in items if is_filterable(k)}
+        return {k: get_filter_type(v.type) for k, v in items if k in filterable}
 
     @property
     def field_args(self):
+        snapshot = get_snapshot_args(self.node_type, self.fields)
+        if snapshot is not None:
+            return self._field_args(self.fields.items(), snapshot[0])
         return self._field_args(self.fields.items())
 
     @property
@@ -202,19 +601,17 @@ class MongoengineConnectionField(ConnectionField):
         if self._type._meta.filter_fields:
             for field, filter_collection in self._type._meta.filter_fields.items():
                 for each in filter_collection:
-                    if str(self._type._meta.fields[field].type) in (
-                        "PointFieldType",
-                        "PointFieldType!",
-                    ):
-                        if each == "max_distance":
-                            filter_type = graphene.Int
-                        else:
-                            filter_type = PointFieldInputType
+                    field_type = str(self._type._meta.fields[field].type).replace("!", "")
+                    if field_type in GEO_FILTER_TYPES:
+                        if each not in GEO_FILTER_TYPES[field_type]:
+                            raise ValueError(
+                                "Unsupported filter `{}` on the {} field `{}`".format(
+                                    each, field_type, field
+                                )
+                            )
+                        filter_type = GEO_FILTER_TYPES[field_type][each]
                     else:
-                        filter_type = getattr(
-                            graphene,
-                            str(self._type._meta.fields[field].type).replace("!", ""),
-                        )
+                        filter_type = getattr(graphene, field_type)
                     # handle special cases
                     advanced_filter_types = {
                         "in": graphene.List(filter_type),
@@ -227,6 +624,10 @@ class MongoengineConnectionField(ConnectionField):
 
     @property
     def advance_args(self):
+        snapshot = get_snapshot_args(self.node_type, self.fields)
+        if snapshot is not None:
+            return snapshot[1]
+
         def get_advance_field(r, kv):
             field = kv[1]
             mongo_field = getattr(self.model, kv[0], None)
@@ -271,78 +672,261 @@ class MongoengineConnectionField(ConnectionField):
                 args.update({k: graphene.ID()})
         return args
 
+    @property
+    def order_by_args(self):
+        order_by_enum = getattr(self.node_type._meta, "order_by_enum", None)
+        if order_by_enum is None:
+            return {}
+        return {
+            "order_by": graphene.Argument(
+                graphene.List(graphene.NonNull(order_by_enum)),
+                description="Sort keys, the first one taking precedence",
+            )
+        }
+
+    @property
+    def where_args(self):
+        if not getattr(self.node_type._meta, "filter_input", False):
+            return {}
+        return {"where": graphene.Argument(get_filter_input_type(self.node_type, self.field_args))}
+
+    def get_where_filter(self, where) -> dict:
+        """Compiles the `where` argument to a raw filter, see filters.compile_filter"""
+        if not where:
+            return {}
+        return compile_filter(self.model, where, global_id_fields=("id",))
+
+    def get_order_by(self, order_by=None):
+        """
+        Returns the sort keys for the `order_by` argument, else `Meta.order_by`, ending
+        with `_id` so that documents with equal sort values keep a stable order across
+        pages
+        """
+        if order_by:
+            keys = [getattr(each, "value", each) for each in order_by]
+        else:
+            keys = [self.order_by] if self.order_by else []
+        names = [key.lstrip("+-") for key in keys]
+        if keys and not {"_id", "id", "pk"} & set(names):
+            keys.append("-_id" if keys[-1].startswith("-") else "+_id")
+        return keys
+
     @property
     def fields(self):
         self._type = get_type(self._type)
         return self._type._meta.fields
 
+    @property
+    def argument_plan(self) -> ArgumentPlan:
+        if self._argument_plan is None:
+            self._argument_plan = ArgumentPlan(self)
+        return self._argument_plan
+
     def get_queryset(
         self, model, info, required_fields=None, skip=None, limit=None, **args
     ) -> QuerySet:
         if required_fields is None:
             required_fields = list()
+        order_by = args.pop("order_by", None)
+        where_filter = self.get_where_filter(args.pop("where", None))
 
         if args:
-            reference_fields = get_model_reference_fields(self.model)
+            queryset_coercers = self.argument_plan.queryset_coercers
             hydrated_references = {}
             for arg_name, arg in args.copy().items():
-                if arg_name in reference_fields and not isinstance(
-                    arg, mongoengine.base.metaclasses.TopLevelDocumentMetaclass
-                ):
-                    try:
-                        reference_obj = reference_fields[arg_name].document_type(
-                            pk=from_global_id(arg)[1]
-                        )
-                    except TypeError:
-                        reference_obj = reference_fields[arg_name].document_type(pk=arg)
-                    hydrated_references[arg_name] = reference_obj
-                elif arg_name in self.model._fields_ordered and isinstance(
-                    getattr(self.model, arg_name),
-                    mongoengine.fields.GenericReferenceField,
-                ):
-                    try:
-                        reference_obj = get_document(
-                            self.registry._registry_string_map[from_global_id(arg)[0]]
-                        )(pk=from_global_id(arg)[1])
-                    except TypeError:
-                        reference_obj = get_document(arg["_cls"])(pk=arg["_ref"].id)
-                    hydrated_references[arg_name] = reference_obj
-                elif "__near" in arg_name and isinstance(
-                    getattr(self.model, arg_name.split("__")[0]),
-                    mongoengine.fields.PointField,
-                ):
-                    location = args.pop(arg_name, None)
-                    hydrated_references[arg_name] = location["coordinates"]
-                    if (arg_name.split("__")[0] + "__max_distance") not in args:
-                        hydrated_references[arg_name.split("__")[0] + "__max_distance"] = 10000
-                elif arg_name == "id":
-                    hydrated_references["id"] = from_global_id(args.pop("id", None))[1]
+                coerce = queryset_coercers.get(arg_name)
+                if coerce is not None:
+                    hydrated_references.update(coerce(arg_name, arg, args))
             args.update(hydrated_references)
 
         if self._get_queryset:
             queryset_or_filters = self._get_queryset(model, info, **args)
             if isinstance(queryset_or_filters, mongoengine.QuerySet):
-                return queryset_or_filters
+                if where_filter:
+                    queryset_or_filters = queryset_or_filters.filter(__raw__=where_filter)
+                if order_by:
+                    queryset_or_filters = queryset_or_filters.order_by(*self.get_order_by(order_by))
+                if queryset_or_filters._max_time_ms is None:
+                    queryset_or_filters = with_max_time_ms(
+                        queryset_or_filters, self.get_max_time_ms(info)
+                    )
+                if queryset_or_filters._read_preference is None:
+                    queryset_or_filters = with_read_preference(
+                        queryset_or_filters, self.get_read_preference(info)
+                    )
+                return self.apply_index_policy(queryset_or_filters)
             else:
                 args.update(queryset_or_filters)
+        if where_filter:
+            args["__raw__"] = where_filter
+        queryset = self.get_objects(info, model)(**args).no_dereference().only(*required_fields)
+        queryset = with_max_time_ms(
+            queryset.order_by(*self.get_order_by(order_by)), self.get_max_time_ms(info)
+        )
+        queryset = with_read_preference(queryset, self.get_read_preference(info))
         if limit is not None:
-            return (
-                model.objects(**args)
-                .no_dereference()
-                .only(*required_fields)
-                .order_by(self.order_by)
-                .skip(skip if skip else 0)
-                .limit(limit)
-            )
+            queryset = queryset.skip(skip if skip else 0).limit(limit)
         elif skip is not None:
-            return (
-                model.objects(**args)
-                .no_dereference()
-                .only(*required_fields)
-                .order_by(self.order_by)
-                .skip(skip)
+            queryset = queryset.skip(skip)
+        return self.apply_index_policy(queryset)
+
+    def get_collection(self, info=None):
+        collection = get_routed_collection(info, self.model, self.router)
+        return with_read_preference(collection, self.get_read_preference(info))
+
+    def get_geo_filter(self, args) -> dict:
+        """Compiles the `$geoWithin`/`$geoIntersects` arguments to a filter document"""
+        geo_args = {
+            key: value for key, value in args.items() if key in self.argument_plan.geo_filter_args
+        }
+        hydrated = {}
+        for arg_name, arg in geo_args.items():
+            hydrated.update(
+                self.argument_plan.queryset_coercers[arg_name](arg_name, arg, dict(geo_args))
+            )
+        if not hydrated:
+            return {}
+        return self.model.objects(**hydrated)._query
+
+    def get_near_arg(self, args):
+        for key in args:
+            field_name, _, operator = key.rpartition("__")
+            if operator in GEO_NEAR_OPERATORS and isinstance(
+                self.model._fields.get(field_name), mongoengine.fields.PointField
+            ):
+                return key
+        return None
+
+    def get_geo_near_page(self, info, required_fields, skip, limit, near_arg, **args):
+        """
+        Runs a `near` query as a `$geoNear` aggregation, storing each document's distance
+        in `distance_field`. One extra document is fetched to tell whether there is a next
+        page, so no count is needed.
+
+        Returns:
+            (list, bool): the page and whether there is a next page
+        """
+        field_name = near_arg.rpartition("__")[0]
+        location = args.pop(near_arg)
+        max_distance = args.pop(field_name + "__max_distance", None)
+        min_distance = args.pop(field_name + "__min_distance", None)
+        queryset = self.get_queryset(self.model, info, required_fields, **args)
+
+        geo_near = {
+            "near": {"type": "Point", "coordinates": location["coordinates"]},
+            "distanceField": self.distance_field,
+            "key": self.model._fields[field_name].db_field,
+            "spherical": True,
+            "query": queryset._query,
+        }
+        if max_distance is not None:
+            geo_near["maxDistance"] = max_distance
+        if min_distance is not None:
+            geo_near["minDistance"] = min_distance
+        pipeline = [{"$geoNear": geo_near}]
+        if skip:
+            pipeline.append({"$skip": skip})
+        if limit is not None:
+            pipeline.append({"$limit": limit + 1})
+        projection = queryset._loaded_fields.as_dict()
+        if projection:
+            projection[self.distance_field] = 1
+            pipeline.append({"$project": projection})
+
+        max_time_ms = self.get_max_time_ms(info)
+        options = {} if max_time_ms is None else {"maxTimeMS": max_time_ms}
+        documents = []
+        for son in self.get_collection(info).aggregate(pipeline, **options):
+            distance = son.pop(self.distance_field, None)
+            document = self.model._from_son(son)
+            setattr(document, self.distance_field, distance)
+            documents.append(document)
+        if limit is not None and len(documents) > limit:
+            return documents[:limit], True
+        return documents, False
+
+    def count_documents(self, info, query, collection=None) -> int:
+        """
+        Counts the documents matching `query`, within the field's time limit.
+
+        With `count_cache`, counts are cached by model and filter document until they
+        expire or the model is written to, see cache.invalidate_counts. With
+        `estimated_count`, an empty filter over a model that isn't part of an
+        inheritance hierarchy is counted from the collection metadata, cached for
+        ESTIMATED_COUNT_TTL seconds, rather than by scanning the collection.
+
+        Args:
+            info (ResolveInfo)
+            query (dict): filter document
+            collection (pymongo.collection.Collection): defaults to the model's collection
+        """
+        if collection is None:
+            collection = self.get_collection(info)
+        else:
+            collection = with_read_preference(collection, self.get_read_preference(info))
+        max_time_ms = self.get_max_time_ms(info)
+        options = {} if max_time_ms is None else {"maxTimeMS": max_time_ms}
+        if not query and self.estimated_count and not self.model._meta.get("allow_inheritance"):
+            return estimated_counts.get_or_set(
+                (id(collection.database.client), collection.full_name),
+                partial(collection.estimated_document_count, **options),
             )
-        return model.objects(**args).no_dereference().only(*required_fields).order_by(self.order_by)
+        count_cache = self.count_cache
+        if count_cache is None:
+            return collection.count_documents(query, **options)
+        count_caches.add(count_cache)
+        key = (
+            self.model,
+            id(collection.database.client),
+            collection.full_name,
+            json_util.dumps(query, sort_keys=True),
+        )
+        return count_cache.get_or_set(key, partial(collection.count_documents, query, **options))
+
+    def apply_index_policy(self, queryset: QuerySet) -> QuerySet:
+        """
+        Checks the queryset against the indexes declared on the model.
+
+        Depending on `index_policy`, filters/sorts no index can serve are logged
+        ("warn") or rejected ("raise"). With `index_hint` the best matching
+        index is attached to the queryset via `.hint()`.
+        """
+        if not self.index_policy and not self.index_hint:
+            return queryset
+        filter_key_sets = get_filter_key_sets(queryset._query)
+        sort_keys = queryset._ordering or ()
+        if filter_key_sets == [set()] and not sort_keys:
+            return queryset
+        index, message = None, None
+        if filter_key_sets is None:
+            message = "No index on {} can serve a $nor filter".format(
+                self.model._get_collection_name()
+            )
+        for filter_keys in filter_key_sets or ():
+            # Every $or branch is served by an index of its own
+            index = find_index_for_query(self.indexes, filter_keys, sort_keys)
+            if index is None:
+                message = "No index on {} can serve filter {} sorted by {}".format(
+                    self.model._get_collection_name(), sorted(filter_keys), list(sort_keys)
+                )
+                break
+        if message is not None:
+            if self.index_policy == "raise":
+                raise UnindexedQueryError(message)
+            if self.index_policy == "warn":
+                logging.warning(message)
+        elif (
+            self.index_hint
+            and len(filter_key_sets) == 1
+            and queryset._hint == -1
+            and all(isinstance(direction, int) for _, direction in index)
+            and not any(
+                isinstance(value, dict) and ("$near" in value or "$nearSphere" in value)
+                for value in queryset._query.values()
+            )
+        ):
+            queryset = queryset.hint(list(index))
+        return queryset
 
     def default_resolver(self, _root, info, required_fields=None, resolved=None, **args):
         if required_fields is None:
@@ -384,33 +968,62 @@ class MongoengineConnectionField(ConnectionField):
         if before:
             before = cursor_to_offset(before)
         requires_page_info = has_page_info(info)
-        has_next_page = False
+        # Derived from `count` at the end unless a branch sets it
+        has_next_page = None
+        # Unpaginated queryset of the connection, for its aggregate field
+        aggregate_queryset = None
+
+        page_key = page = None
+        if resolved is None and _root is None:
+            page_key = self.get_page_key(info, required_fields, args, first, last, after, before)
+        if page_key is not None:
+            page = self.get_cached_page(page_key)
 
-        if resolved is not None:
+        if page is not None:
+            iterables, skip, has_next_page = page
+            list_length = len(iterables)
+            aggregate_queryset = partial(self.get_queryset, self.model, info, None, **args)
+        elif resolved is not None:
             items = resolved
+            order_by = args.pop("order_by", None)
+            where_filter = self.get_where_filter(args.pop("where", None))
+            if where_filter and isinstance(items, QuerySet):
+                items = items.filter(__raw__=where_filter)
+            if order_by and isinstance(items, QuerySet):
+                items = self.apply_index_policy(items.order_by(*self.get_order_by(order_by)))
+            if isinstance(items, QuerySet):
+                aggregate_queryset = items.clone
 
             if isinstance(items, QuerySet):
                 try:
-                    if last is not None:
-                        count = items.count(with_limit_and_skip=False)
+                    if last is not None and (items._none or items._empty):
+                        count = 0
+                    elif last is not None and before is None:
+                        count = self.count_documents(info, items._query, items._collection)
                     else:
                         count = None
+                except ExecutionTimeout:
+                    raise
                 except OperationFailure:
-                    count = len(items)
+                    count = count_by_ids(items)
             else:
                 count = len(items)
 
             skip, limit = find_skip_and_limit(
-                first=first, last=last, after=after, before=before, count=count
+                first=first,
+                last=last,
+                after=after,
+                before=before,
+                count=count,
+                max_limit=self.max_limit,
             )
 
             if isinstance(items, QuerySet):
                 if limit:
-                    _base_query: QuerySet = items.skip(skip)
-                    items = _base_query.limit(limit)
-                    has_next_page = len(_base_query.skip(skip + limit).only("id").limit(1)) != 0
+                    items = items.skip(skip).limit(limit)
                 elif skip:
                     items = items.skip(skip)
+                iterables, has_next_page = fetch_page(items, count)
             else:
                 if limit:
                     _base_query = items
@@ -420,14 +1033,20 @@ class MongoengineConnectionField(ConnectionField):
                     )
                 elif skip:
                     items = items[skip:]
-            iterables = list(items)
+                iterables = list(items)
             list_length = len(iterables)
 
         elif callable(getattr(self.model, "objects", None)):
+            aggregate_queryset = partial(self.get_queryset, self.model, info, None, **args)
             if "pk__in" in args and args["pk__in"]:
                 count = len(args["pk__in"])
                 skip, limit = find_skip_and_limit(
-                    first=first, last=last, after=after, before=before, count=count
+                    first=first,
+                    last=last,
+                    after=after,
+                    before=before,
+                    count=count,
+                    max_limit=self.max_limit,
                 )
                 if limit:
                     args["pk__in"] = args["pk__in"][skip : skip + limit]
@@ -446,54 +1065,60 @@ class MongoengineConnectionField(ConnectionField):
                 or args
                 or isinstance(getattr(_root, field_name, []), MongoengineConnectionField)
             ):
-                args_copy = args.copy()
-                for key in args.copy():
-                    if key not in self.model._fields_ordered:
-                        args_copy.pop(key)
-                    elif (
-                        isinstance(getattr(self.model, key), mongoengine.fields.ReferenceField)
-                        or isinstance(
-                            getattr(self.model, key),
-                            mongoengine.fields.GenericReferenceField,
-                        )
-                        or isinstance(
-                            getattr(self.model, key),
-                            mongoengine.fields.LazyReferenceField,
-                        )
-                        or isinstance(
-                            getattr(self.model, key),
-                            mongoengine.fields.CachedReferenceField,
+                near_arg = self.get_near_arg(args) if self.distance_field else None
+                count_coercers = self.argument_plan.count_coercers
+                args_copy = {
+                    key: count_coercers[key](value)
+                    for key, value in args.items()
+                    if key in count_coercers
+                }
+                args_copy.update(self.get_geo_filter(args))
+                where_filter = self.get_where_filter(args.get("where"))
+                if where_filter:
+                    args_copy = {"$and": [args_copy, where_filter]} if args_copy else where_filter
+
+                if near_arg is not None:
+                    if last is not None and before is None:
+                        raise ValueError(
+                            "`last` requires `before` when sorting by distance, "
+                            "the documents near the point are not counted"
                         )
-                    ):
-                        if not isinstance(args_copy[key], ObjectId):
-                            _from_global_id = from_global_id(args_copy[key])[1]
-                            if bson.objectid.ObjectId.is_valid(_from_global_id):
-                                args_copy[key] = ObjectId(_from_global_id)
-                            else:
-                                args_copy[key] = _from_global_id
-                    elif isinstance(getattr(self.model, key), mongoengine.fields.EnumField):
-                        if getattr(args_copy[key], "value", None):
-                            args_copy[key] = args_copy[key].value
-
-                if PYMONGO_VERSION >= (3, 7):
-                    if hasattr(self.model, "_meta") and "db_alias" in self.model._meta:
-                        count = (
-                            mongoengine.get_db(self.model._meta["db_alias"])[
-                                self.model._get_collection_name()
-                            ]
-                        ).count_documents(args_copy)
-                    else:
-                        count = (
-                            mongoengine.get_db()[self.model._get_collection_name()]
-                        ).count_documents(args_copy)
+                    count = 0
+                    skip, limit = find_skip_and_limit(
+                        first=first,
+                        after=after,
+                        last=last,
+                        before=before,
+                        max_limit=self.max_limit,
+                    )
+                    iterables, has_next_page = self.get_geo_near_page(
+                        info, required_fields, skip, limit, near_arg, **args
+                    )
+                    list_length = len(iterables)
+                elif last is None or before is not None:
+                    # Paged without a count, see fetch_page
+                    count = None
+                elif PYMONGO_VERSION >= (3, 7):
+                    count = self.count_documents(info, args_copy)
                 else:
-                    count = self.model.objects(args_copy).count()
+                    count = with_read_preference(
+                        with_max_time_ms(
+                            self.get_objects(info)(args_copy), self.get_max_time_ms(info)
+                        ),
+                        self.get_read_preference(info),
+                    ).count()
                 if count != 0:
                     skip, limit = find_skip_and_limit(
-                        first=first, after=after, last=last, before=before, count=count
+                        first=first,
+                        after=after,
+                        last=last,
+                        before=before,
+                        count=count,
+                        max_limit=self.max_limit,
                     )
-                    iterables = self.get_queryset(
-                        self.model, info, required_fields, skip, limit, **args
+                    iterables, has_next_page = fetch_page(
+                        self.get_queryset(self.model, info, required_fields, skip, limit, **args),
+                        count,
                     )
                     list_length = len(iterables)
                     if isinstance(info, GraphQLResolveInfo):
@@ -508,7 +1133,12 @@ class MongoengineConnectionField(ConnectionField):
             items = getattr(_root, field_name, [])
             count = len(items)
             skip, limit = find_skip_and_limit(
-                first=first, last=last, after=after, before=before, count=count
+                first=first,
+                last=last,
+                after=after,
+                before=before,
+                count=count,
+                max_limit=self.max_limit,
             )
             if limit:
                 _base_query = items
@@ -519,12 +1149,18 @@ class MongoengineConnectionField(ConnectionField):
             iterables = items
             list_length = len(iterables)
 
-        if count:
+        if has_next_page is None:
             has_next_page = (
                 True
-                if (0 if limit is None else limit) + (0 if skip is None else skip) < count
+                if count and (0 if limit is None else limit) + (0 if skip is None else skip) < count
                 else False
             )
+        if page_key is not None and page is None:
+            self.cache_page(page_key, iterables, skip, has_next_page)
+        if self.argument_plan.file_fields:
+            GridFSFileLoader.for_request(info).prime_documents(
+                iterables, self.argument_plan.file_fields
+            )
         has_previous_page = True if skip else False
 
         connection = connection_from_iterables(
@@ -538,6 +1174,8 @@ class MongoengineConnectionField(ConnectionField):
         )
         connection.iterable = iterables
         connection.list_length = list_length
+        connection.aggregate_queryset = aggregate_queryset
+        connection.aggregate_executor = self.executor
         return connection
 
     def chained_resolver(self, resolver, is_partial, root, info, **args):
@@ -561,25 +1199,9 @@ class MongoengineConnectionField(ConnectionField):
             if isinstance(self.model, mongoengine.Document) or isinstance(
                 self.model, mongoengine.base.metaclasses.TopLevelDocumentMetaclass
             ):
-                connection_fields = [
-                    field
-                    for field in self.fields
-                    if isinstance(self.fields[field], MongoengineConnectionField)
-                ]
-
-                def filter_connection(x):
-                    return any(
-                        [
-                            connection_fields.__contains__(x),
-                            self._type._meta.non_filter_fields.__contains__(x),
-                        ]
-                    )
-
-                filterable_args = tuple(
-                    filterfalse(filter_connection, list(self.model._fields_ordered))
-                )
-                for arg_name, arg in args.copy().items():
-                    if arg_name not in filterable_args + tuple(self.filter_args.keys()):
+                filterable_args = self.argument_plan.filterable_args
+                for arg_name in args:
+                    if arg_name not in filterable_args:
                         args_copy.pop(arg_name)
                 if isinstance(info, GraphQLResolveInfo):
                     if not info.context:
@@ -602,13 +1224,9 @@ class MongoengineConnectionField(ConnectionField):
                 elif isinstance(resolved, QuerySet):
                     args.update(resolved._query)
                     args_copy = args.copy()
+                    resolved_args = self.argument_plan.resolved_args
                     for arg_name, arg in args.copy().items():
-                        if "." in arg_name or arg_name not in self.model._fields_ordered + (
-                            "first",
-                            "last",
-                            "before",
-                            "after",
-                        ) + tuple(self.filter_args.keys()):
+                        if "." in arg_name or arg_name not in resolved_args:
                             args_copy.pop(arg_name)
                             if arg_name == "_id" and isinstance(arg, dict):
                                 operation = list(arg.keys())[0]
@@ -1,10 +1,8 @@
 from __future__ import absolute_import
 
 from functools import partial
-from itertools import filterfalse
 from typing import Coroutine
 
-import bson
 import graphene
 import mongoengine
 import pymongo
@@ -16,17 +14,22 @@ from graphql import GraphQLResolveInfo
 from graphql_relay import cursor_to_offset, from_global_id
 from mongoengine import QuerySet
 from promise import Promise
-from pymongo.errors import OperationFailure
+from pymongo.errors import ExecutionTimeout, OperationFailure
 
 from . import MongoengineConnectionField
+from .advanced_types import GridFSFileLoader
 from .registry import get_global_async_registry
 from .utils import (
     ExecutorEnum,
     connection_from_iterables,
+    count_by_ids,
+    fetch_page,
     find_skip_and_limit,
     get_query_fields,
     has_page_info,
     sync_to_async,
+    with_max_time_ms,
+    with_read_preference,
 )
 
 PYMONGO_VERSION = tuple(pymongo.version_tuple[:2])
@@ -101,42 +104,64 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
         if before:
             before = cursor_to_offset(before)
         requires_page_info = has_page_info(info)
-        has_next_page = False
-
-        if resolved is not None:
+        # Derived from `count` at the end unless a branch sets it
+        has_next_page = None
+        # Unpaginated queryset of the connection, for its aggregate field
+        aggregate_queryset = None
+
+        page_key = page = None
+        if resolved is None and _root is None:
+            page_key = self.get_page_key(info, required_fields, args, first, last, after, before)
+        if page_key is not None:
+            page = await sync_to_async(self.get_cached_page)(page_key)
+
+        if page is not None:
+            iterables, skip, has_next_page = page
+            list_length = len(iterables)
+            aggregate_queryset = partial(self.get_queryset, self.model, info, None, **args)
+        elif resolved is not None:
             items = resolved
+            order_by = args.pop("order_by", None)
+            where_filter = self.get_where_filter(args.pop("where", None))
+            if where_filter and isinstance(items, QuerySet):
+                items = items.filter(__raw__=where_filter)
+            if order_by and isinstance(items, QuerySet):
+                items = self.apply_index_policy(items.order_by(*self.get_order_by(order_by)))
+            if isinstance(items, QuerySet):
+                aggregate_queryset = items.clone
 
             if isinstance(items, QuerySet):
                 try:
-                    if last is not None:
-                        count = await sync_to_async(items.count)(with_limit_and_skip=False)
+                    if last is not None and (items._none or items._empty):
+                        count = 0
+                    elif last is not None and before is None:
+                        count = await sync_to_async(self.count_documents)(
+                            info, items._query, items._collection
+                        )
                     else:
                         count = None
+                except ExecutionTimeout:
+                    raise
                 except OperationFailure:
-                    count = await sync_to_async(len)(items)
+                    count = await sync_to_async(count_by_ids)(items)
             else:
                 count = len(items)
 
             skip, limit = find_skip_and_limit(
-                first=first, last=last, after=after, before=before, count=count
+                first=first,
+                last=last,
+                after=after,
+                before=before,
+                count=count,
+                max_limit=self.max_limit,
             )
 
             if isinstance(items, QuerySet):
                 if limit:
-                    _base_query: QuerySet = await sync_to_async(items.skip)(skip)
-                    items = await sync_to_async(_base_query.limit)(limit)
-                    has_next_page = (
-                        (
-                            await sync_to_async(len)(
-                                _base_query.skip(skip + limit).only("id").limit(1)
-                            )
-                            != 0
-                        )
-                        if requires_page_info
-                        else False
-                    )
+                    items = items.skip(skip).limit(limit)
                 elif skip:
-                    items = await sync_to_async(items.skip)(skip)
+                    items = items.skip(skip)
+                iterables, has_next_page = await sync_to_async(fetch_page)(items, count)
             else:
                 if limit:
                     _base_query = items
@@ -146,14 +171,20 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
                     )
                 elif skip:
                     items = items[skip:]
-            iterables = await sync_to_async(list)(items)
+                iterables = list(items)
             list_length = len(iterables)
 
         elif callable(getattr(self.model, "objects", None)):
+            aggregate_queryset = partial(self.get_queryset, self.model, info, None, **args)
             if "pk__in" in args and args["pk__in"]:
                 count = len(args["pk__in"])
                 skip, limit = find_skip_and_limit(
-                    first=first, last=last, after=after, before=before, count=count
+                    first=first,
+                    last=last,
+                    after=after,
+                    before=before,
+                    count=count,
+                    max_limit=self.max_limit,
                 )
                 if limit:
                     args["pk__in"] = args["pk__in"][skip : skip + limit]
@@ -173,49 +204,63 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
                 or args
                 or isinstance(getattr(_root, field_name, []), AsyncMongoengineConnectionField)
             ):
-                args_copy = args.copy()
-                for key in args.copy():
-                    if key not in self.model._fields_ordered:
-                        args_copy.pop(key)
-                    elif (
-                        isinstance(getattr(self.model, key), mongoengine.fields.ReferenceField)
-                        or isinstance(
-                            getattr(self.model, key),
-                            mongoengine.fields.GenericReferenceField,
-                        )
-                        or isinstance(
-                            getattr(self.model, key),
-                            mongoengine.fields.LazyReferenceField,
+                near_arg = self.get_near_arg(args) if self.distance_field else None
+                count_coercers = self.argument_plan.count_coercers
+                args_copy = {
+                    key: count_coercers[key](value)
+                    for key, value in args.items()
+                    if key in count_coercers
+                }
+                args_copy.update(self.get_geo_filter(args))
+                where_filter = self.get_where_filter(args.get("where"))
+                if where_filter:
+                    args_copy = {"$and": [args_copy, where_filter]} if args_copy else where_filter
+
+                if near_arg is not None:
+                    if last is not None and before is None:
+                        raise ValueError(
+                            "`last` requires `before` when sorting by distance, "
+                            "the documents near the point are not counted"
                         )
-                        or isinstance(
-                            getattr(self.model, key),
-                            mongoengine.fields.CachedReferenceField,
-                        )
-                    ):
-                        if not isinstance(args_copy[key], ObjectId):
-                            _from_global_id = from_global_id(args_copy[key])[1]
-                            if bson.objectid.ObjectId.is_valid(_from_global_id):
-                                args_copy[key] = ObjectId(_from_global_id)
-                            else:
-                                args_copy[key] = _from_global_id
-                    elif isinstance(getattr(self.model, key), mongoengine.fields.EnumField):
-                        if getattr(args_copy[key], "value", None):
-                            args_copy[key] = args_copy[key].value
-
-                if PYMONGO_VERSION >= (3, 7):
-                    count = await sync_to_async(
-                        (mongoengine.get_db()[self.model._get_collection_name()]).count_documents
-                    )(args_copy)
+                    count = 0
+                    skip, limit = find_skip_and_limit(
+                        first=first,
+                        after=after,
+                        last=last,
+                        before=before,
+                        max_limit=self.max_limit,
+                    )
+                    iterables, has_next_page = await sync_to_async(self.get_geo_near_page)(
+                        info, required_fields, skip, limit, near_arg, **args
+                    )
+                    list_length = len(iterables)
+                elif last is None or before is not None:
+                    # Paged without a count, see fetch_page
+                    count = None
+                elif PYMONGO_VERSION >= (3, 7):
+                    count = await sync_to_async(self.count_documents)(info, args_copy)
                 else:
-                    count = await sync_to_async(self.model.objects(args_copy).count)()
+                    count = await sync_to_async(
+                        with_read_preference(
+                            with_max_time_ms(
+                                self.get_objects(info)(args_copy), self.get_max_time_ms(info)
+                            ),
+                            self.get_read_preference(info),
+                        ).count
+                    )()
                 if count != 0:
                     skip, limit = find_skip_and_limit(
-                        first=first, after=after, last=last, before=before, count=count
+                        first=first,
+                        after=after,
+                        last=last,
+                        before=before,
+                        count=count,
+                        max_limit=self.max_limit,
                     )
                     iterables = self.get_queryset(
                         self.model, info, required_fields, skip, limit, **args
                     )
-                    iterables = await sync_to_async(list)(iterables)
+                    iterables, has_next_page = await sync_to_async(fetch_page)(iterables, count)
                     list_length = len(iterables)
                     if isinstance(info, GraphQLResolveInfo):
                         if not info.context:
@@ -229,7 +274,12 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
             items = getattr(_root, field_name, [])
             count = len(items)
             skip, limit = find_skip_and_limit(
-                first=first, last=last, after=after, before=before, count=count
+                first=first,
+                last=last,
+                after=after,
+                before=before,
+                count=count,
+                max_limit=self.max_limit,
             )
             if limit:
                 _base_query = items
@@ -241,12 +291,20 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
             iterables = await sync_to_async(list)(iterables)
             list_length = len(iterables)
 
-        if requires_page_info and count:
+        if has_next_page is None:
             has_next_page = (
                 True
-                if (0 if limit is None else limit) + (0 if skip is None else skip) < count
+                if requires_page_info
+                and count
+                and (0 if limit is None else limit) + (0 if skip is None else skip) < count
                 else False
             )
+        if page_key is not None and page is None:
+            await sync_to_async(self.cache_page)(page_key, iterables, skip, has_next_page)
+        if self.argument_plan.file_fields:
+            GridFSFileLoader.for_request(info).prime_documents(
+                iterables, self.argument_plan.file_fields
+            )
         has_previous_page = True if requires_page_info and skip else False
 
         connection = connection_from_iterables(
@@ -260,6 +318,8 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
         )
         connection.iterable = iterables
         connection.list_length = list_length
+        connection.aggregate_queryset = aggregate_queryset
+        connection.aggregate_executor = self.executor
         return connection
 
     async def chained_resolver(self, resolver, is_partial, root, info, **args):
@@ -283,25 +343,9 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
             if isinstance(self.model, mongoengine.Document) or isinstance(
                 self.model, mongoengine.base.metaclasses.TopLevelDocumentMetaclass
             ):
-                connection_fields = [
-                    field
-                    for field in self.fields
-                    if isinstance(self.fields[field], AsyncMongoengineConnectionField)
-                ]
-
-                def filter_connection(x):
-                    return any(
-                        [
-                            connection_fields.__contains__(x),
-                            self._type._meta.non_filter_fields.__contains__(x),
-                        ]
-                    )
-
-                filterable_args = tuple(
-                    filterfalse(filter_connection, list(self.model._fields_ordered))
-                )
-                for arg_name, arg in args.copy().items():
-                    if arg_name not in filterable_args + tuple(self.filter_args.keys()):
+                filterable_args = self.argument_plan.filterable_args
+                for arg_name in args:
+                    if arg_name not in filterable_args:
                         args_copy.pop(arg_name)
                 if isinstance(info, GraphQLResolveInfo):
                     if not info.context:
@@ -327,13 +371,9 @@ class AsyncMongoengineConnectionField(MongoengineConnectionField):
                 elif isinstance(resolved, QuerySet):
                     args.update(resolved._query)
                     args_copy = args.copy()
+                    resolved_args = self.argument_plan.resolved_args
                     for arg_name, arg in args.copy().items():
-                        if "." in arg_name or arg_name not in self.model._fields_ordered + (
-                            "first",
-                            "last",
-                            "before",
-                            "after",
-                        ) + tuple(self.filter_args.keys()):
+                        if "." in arg_name or arg_name not in resolved_args:
                             args_copy.pop(arg_name)
                             if arg_name == "_id" and isinstance(arg, dict):
                                 operation = list(arg.keys())[0]
@@ -0,0 +1,134 @@
+import graphene
+from graphql_relay import from_global_id
+
+# Operators of the per-scalar filter inputs, to their MongoDB counterparts
+FILTER_OPERATORS = {
+    "eq": "$eq",
+    "ne": "$ne",
+    "lt": "$lt",
+    "lte": "$lte",
+    "gt": "$gt",
+    "gte": "$gte",
+    "in": "$in",
+    "nin": "$nin",
+    "exists": "$exists",
+}
+LIST_OPERATORS = ("in", "nin")
+
+_scalar_filter_types = {}
+_filter_input_types = {}
+
+
+def get_scalar_filter_type(scalar):
+    """
+    Returns the `<Scalar>FilterInput` of `scalar`, e.g. `StringFilterInput`, created
+    once per scalar
+    """
+    if scalar not in _scalar_filter_types:
+        fields = {}
+        for operator in FILTER_OPERATORS:
+            if operator in LIST_OPERATORS:
+                _type = graphene.List(graphene.NonNull(scalar))
+            elif operator == "exists":
+                _type = graphene.Boolean()
+            else:
+                _type = scalar()
+            fields[operator + "_"] = graphene.InputField(_type, name=operator)
+        _scalar_filter_types[scalar] = type(
+            "{}FilterInput".format(scalar._meta.name), (graphene.InputObjectType,), fields
+        )
+    return _scalar_filter_types[scalar]
+
+
+def get_filter_input_type(node_type, field_args):
+    """
+    Returns the `<Node>FilterInput` of `node_type`, created once per type
+
+    Args:
+        node_type (MongoengineObjectType):
+        field_args (dict): filterable field name to scalar, see
+            MongoengineConnectionField.field_args
+
+    Returns:
+        graphene.InputObjectType: with a `<Scalar>FilterInput` per field and nested
+            `and`, `or` and `not`
+    """
+    if node_type not in _filter_input_types:
+        name = "{}FilterInput".format(node_type._meta.name)
+        fields = {
+            "and_": graphene.InputField(
+                graphene.List(graphene.NonNull(lambda: _filter_input_types[node_type])),
+                name="and",
+            ),
+            "or_": graphene.InputField(
+                graphene.List(graphene.NonNull(lambda: _filter_input_types[node_type])),
+                name="or",
+            ),
+            "not_": graphene.InputField(lambda: _filter_input_types[node_type], name="not"),
+        }
+        for field_name, scalar in field_args.items():
+            if not isinstance(scalar, graphene.Scalar):
+                continue
+            fields[field_name] = graphene.InputField(get_scalar_filter_type(type(scalar)))
+        _filter_input_types[node_type] = type(name, (graphene.InputObjectType,), fields)
+    return _filter_input_types[node_type]
+
+
+def compile_field_filter(field, operators, is_global_id=False):
+    def prepare(value):
+        if is_global_id:
+            value = from_global_id(value)[-1]
+        return field.prepare_query_value(None, value)
+
+    compiled = {}
+    for operator, mongo_operator in FILTER_OPERATORS.items():
+        value = operators.get(operator + "_")
+        if value is None:
+            continue
+        if operator in LIST_OPERATORS:
+            value = [prepare(each) for each in value]
+        elif operator != "exists":
+            value = prepare(value)
+        compiled[mongo_operator] = value
+    return compiled
+
+
+def compile_filter(model, where, global_id_fields=()):
+    """
+    Compiles a `<Node>FilterInput` value to a single MongoDB filter document
+
+    Args:
+        model (mongoengine.Document):
+        where (dict): the `where` argument
+        global_id_fields ([str]): fields whose values are relay global ids
+
+    Returns:
+        dict: raw filter, empty when nothing is filtered
+    """
+    clauses = []
+    for name, value in where.items():
+        if value is None:
+            continue
+        if name == "and_":
+            clauses.extend(
+                filter(None, (compile_filter(model, each, global_id_fields) for each in value))
+            )
+        elif name == "or_":
+            if value:
+                clauses.append(
+                    {"$or": [compile_filter(model, each, global_id_fields) for each in value]}
+                )
+        elif name == "not_":
+            compiled = compile_filter(model, value, global_id_fields)
+            if compiled:
+                clauses.append({"$nor": [compiled]})
+        else:
+            field = model._fields[name]
+            compiled = compile_field_filter(field, value, name in global_id_fields)
+            if compiled:
+                clauses.append({field.db_field: compiled})
+    if not clauses:
+        return {}
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
@@ -0,0 +1,433 @@
+from collections import OrderedDict
+
+import graphene
+import mongoengine
+from graphene.types.mutation import MutationOptions
+from graphene.utils.str_converters import to_snake_case
+from mongoengine.queryset.transform import update as transform_update
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+
+from .cache import invalidate_counts, invalidate_pages
+from .registry import get_global_registry
+from .types import MongoengineInputType
+from .utils import (
+    get_max_time_ms,
+    get_query_fields,
+    get_routed_collection,
+    get_routed_queryset,
+    with_max_time_ms,
+)
+
+BULK_OPERATIONS = ("create", "update", "upsert")
+
+
+class MongoengineBulkMutationOptions(MutationOptions):
+    model = None
+    input_type = None  # type: MongoengineInputType
+    node_type = None
+    operation = None
+    match_fields = ("id",)
+    ordered = True
+    validate = True
+
+
+def validate_fields(model, values):
+    """Validates the given field values only, the way `Document.validate` does"""
+    errors = {}
+    for name, value in values.items():
+        field = model._fields[name]
+        if value is None:
+            if field.required:
+                errors[name] = mongoengine.ValidationError("Field is required", field_name=name)
+            continue
+        try:
+            field._validate(field.to_python(value))
+        except (ValueError, AttributeError, AssertionError, mongoengine.ValidationError) as error:
+            errors[name] = error
+    if errors:
+        raise mongoengine.ValidationError(
+            "ValidationError ({})".format(model._class_name), errors=errors
+        )
+
+
+class MongoengineWriteMutation(graphene.Mutation):
+    """Base of the mutations writing the documents of the model of their `input_type`"""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def check_input_type(cls, input_type, match_fields=()):
+        assert input_type and issubclass(input_type, MongoengineInputType), (
+            "The attribute input_type in {}.Meta must be a MongoengineInputType. "
+            'Received "{}" instead.'
+        ).format(cls.__name__, input_type)
+        missing = [name for name in match_fields if name not in input_type._meta.fields]
+        assert not missing, "The match_fields {} of {} are missing from {}.".format(
+            missing, cls.__name__, input_type.__name__
+        )
+
+    @classmethod
+    def get_node_type(cls):
+        if cls._meta.node_type is not None:
+            return cls._meta.node_type
+        return get_global_registry().get_type_for_model(cls._meta.model)
+
+    @classmethod
+    def split_input(cls, values):
+        """
+        Returns:
+            (dict, dict): the values of the `match_fields`, and the other given values
+        """
+        values = dict(values)
+        missing = [name for name in cls._meta.match_fields if values.get(name) is None]
+        if missing:
+            raise ValueError("Missing {} to match the document to update".format(missing))
+        match = {name: values.pop(name) for name in cls._meta.match_fields}
+        # Input fields left out of the query come as None, they are not updated
+        return match, {name: value for name, value in values.items() if value is not None}
+
+
+class MongoengineBulkMutation(MongoengineWriteMutation):
+    """
+    Base of the createMany / updateMany / upsertMany mutations
+
+    Turns the list of `input_type` items into a single `bulk_write` and returns the
+    written documents, in input order, from one follow-up `$in` query.
+
+    Meta:
+        input_type (MongoengineInputType): type of the `items` argument
+        node_type (MongoengineObjectType): returned type, defaults to the registered type
+            of the input's model
+        match_fields ([str]): fields identifying the document an item updates
+        ordered (bool): whether the writes stop at the first error
+        validate (bool): whether to run the mongoengine validation before writing, of
+            the given fields for updates and of the whole document otherwise
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(
+        cls,
+        input_type=None,
+        node_type=None,
+        operation=None,
+        match_fields=("id",),
+        ordered=True,
+        validate=True,
+        arguments=None,
+        output=None,
+        _meta=None,
+        **options,
+    ):
+        assert operation in BULK_OPERATIONS, (
+            "The attribute operation in {}.Meta must be one of {}."
+        ).format(cls.__name__, BULK_OPERATIONS)
+        cls.check_input_type(input_type, match_fields if operation != "create" else ())
+        model = input_type._meta.model
+
+        if not _meta:
+            _meta = MongoengineBulkMutationOptions(cls)
+        _meta.model = model
+        _meta.input_type = input_type
+        _meta.node_type = node_type
+        _meta.operation = operation
+        _meta.match_fields = tuple(match_fields)
+        _meta.ordered = ordered
+        _meta.validate = validate
+
+        if arguments is None:
+            arguments = OrderedDict(
+                items=graphene.List(graphene.NonNull(input_type), required=True)
+            )
+        if output is None:
+            output = graphene.List(lambda: cls.get_node_type())
+
+        super(MongoengineBulkMutation, cls).__init_subclass_with_meta__(
+            _meta=_meta, arguments=arguments, output=output, **options
+        )
+
+    @classmethod
+    def get_match_key(cls, values):
+        fields = cls._meta.model._fields
+        return tuple(fields[name].to_python(values[name]) for name in cls._meta.match_fields)
+
+    @classmethod
+    def get_update(cls, item):
+        """
+        Returns:
+            (dict, dict, tuple): the filter and the update documents of an update or
+                upsert item, and the key of its document
+        """
+        model = cls._meta.model
+        match, values = cls.split_input(item)
+        if cls._meta.validate and cls._meta.operation == "upsert":
+            # The document is inserted when none matches, it has to be valid as a whole
+            model(**dict(match, **values)).validate()
+        elif cls._meta.validate:
+            validate_fields(model, values)
+        update = transform_update(
+            model, **{"set__" + name: value for name, value in (values or match).items()}
+        )
+        return model.objects(**match)._query, update, cls.get_match_key(match)
+
+    @classmethod
+    def get_write(cls, item):
+        """
+        Returns:
+            (pymongo write operation, tuple): the write and the key of its document
+        """
+        if cls._meta.operation == "create":
+            document = cls._meta.model(**dict(item))
+            if cls._meta.validate:
+                document.validate()
+            son = document.to_mongo()
+            return InsertOne(son), son
+        query, update, key = cls.get_update(item)
+        return UpdateOne(query, update, upsert=cls._meta.operation == "upsert"), key
+
+    @classmethod
+    def mutate(cls, root, info, items):
+        model = cls._meta.model
+        writes, keys = [], []
+        for item in items:
+            write, key = cls.get_write(item)
+            writes.append(write)
+            keys.append(key)
+        if not writes:
+            return []
+        router = cls.get_node_type()._meta.router
+        try:
+            get_routed_collection(info, model, router).bulk_write(writes, ordered=cls._meta.ordered)
+        finally:
+            # Some of the writes may have been applied even when it fails
+            invalidate_counts(model)
+            invalidate_pages(model)
+
+        if cls._meta.operation == "create":
+            # pymongo sets the `_id` of inserted documents
+            keys = [(son["_id"],) for son in keys]
+            match_fields = ("pk",)
+        else:
+            match_fields = cls._meta.match_fields
+        objects = get_routed_queryset(info, model, router)
+        if len(match_fields) == 1:
+            queryset = objects(**{match_fields[0] + "__in": [key[0] for key in keys]})
+        else:
+            queryset = objects(
+                mongoengine.Q(
+                    __raw__={
+                        "$or": [
+                            model.objects(**dict(zip(match_fields, key)))._query for key in keys
+                        ]
+                    }
+                )
+            )
+        queryset = with_max_time_ms(queryset, get_max_time_ms(info))
+        documents = {
+            tuple(getattr(document, name) for name in match_fields): document
+            for document in queryset
+        }
+        return [documents.get(key) for key in keys]
+
+
+class MongoengineCreateManyMutation(MongoengineBulkMutation):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **options):
+        super(MongoengineCreateManyMutation, cls).__init_subclass_with_meta__(
+            operation="create", **options
+        )
+
+
+class MongoengineUpdateManyMutation(MongoengineBulkMutation):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **options):
+        super(MongoengineUpdateManyMutation, cls).__init_subclass_with_meta__(
+            operation="update", **options
+        )
+
+
+class MongoengineUpsertManyMutation(MongoengineBulkMutation):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **options):
+        super(MongoengineUpsertManyMutation, cls).__init_subclass_with_meta__(
+            operation="upsert", **options
+        )
+
+
+class MongoenginePartialUpdateMutationOptions(MutationOptions):
+    model = None
+    input_type = None  # type: MongoengineInputType
+    node_type = None
+    match_fields = ("id",)
+    validate = True
+    return_document = False
+
+
+class MongoenginePartialUpdateMutation(MongoengineWriteMutation):
+    """
+    Updates the fields given in `input` with one atomic `update_one`
+
+    The non-null fields of `input` are `$set`, the fields listed in `unset` are
+    `$unset`, numbers in `inc` are `$inc`-remented and lists in `push` are `$push`-ed.
+
+    Meta:
+        input_type (MongoengineInputType): type of the `input` argument
+        node_type (MongoengineObjectType): returned type, defaults to the registered type
+            of the input's model
+        match_fields ([str]): fields of `input` identifying the document
+        validate (bool): whether to run the mongoengine validation of the `$set` fields
+        return_document (bool): run a `find_one_and_update` projected on the selected
+            fields instead of an `update_one` followed by a fetch
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(
+        cls,
+        input_type=None,
+        node_type=None,
+        match_fields=("id",),
+        validate=True,
+        return_document=False,
+        arguments=None,
+        output=None,
+        _meta=None,
+        **options,
+    ):
+        cls.check_input_type(input_type, match_fields)
+        model = input_type._meta.model
+
+        if not _meta:
+            _meta = MongoenginePartialUpdateMutationOptions(cls)
+        _meta.model = model
+        _meta.input_type = input_type
+        _meta.node_type = node_type
+        _meta.match_fields = tuple(match_fields)
+        _meta.validate = validate
+        _meta.return_document = return_document
+
+        if arguments is None:
+            arguments = OrderedDict(input=graphene.Argument(input_type, required=True))
+            arguments.update(cls.get_operator_arguments(model, input_type, match_fields))
+        if output is None:
+
+            def output():
+                return cls.get_node_type()
+
+        super(MongoenginePartialUpdateMutation, cls).__init_subclass_with_meta__(
+            _meta=_meta, arguments=arguments, output=output, **options
+        )
+
+    @classmethod
+    def get_operator_arguments(cls, model, input_type, match_fields):
+        """Builds the `unset`, `inc` and `push` arguments from the fields of the input"""
+        unset, inc, push = [], OrderedDict(), OrderedDict()
+        for name, field in input_type._meta.fields.items():
+            model_field = model._fields.get(name)
+            if name in match_fields or model_field is None:
+                continue
+            if not model_field.required:
+                unset.append(name)
+            _type = field.type
+            if isinstance(_type, graphene.NonNull):
+                _type = _type.of_type
+            if isinstance(model_field, (mongoengine.IntField, mongoengine.FloatField)):
+                inc[name] = graphene.InputField(_type)
+            elif isinstance(model_field, mongoengine.ListField):
+                push[name] = graphene.InputField(_type)
+
+        arguments = OrderedDict()
+        if unset:
+            unset_enum = graphene.Enum(
+                "{}UnsetField".format(cls.__name__), [(name, name) for name in unset]
+            )
+            arguments["unset"] = graphene.List(graphene.NonNull(unset_enum))
+        if inc:
+            arguments["inc"] = type(
+                "{}Inc".format(cls.__name__), (graphene.InputObjectType,), inc
+            )()
+        if push:
+            arguments["push"] = type(
+                "{}Push".format(cls.__name__), (graphene.InputObjectType,), push
+            )()
+        return arguments
+
+    @classmethod
+    def get_update(cls, input, unset=None, inc=None, push=None):
+        """
+        Returns:
+            (dict, dict): the filter and the update documents
+        """
+        model = cls._meta.model
+        match, values = cls.split_input(input)
+        unset = [getattr(name, "value", name) for name in unset or ()]
+        if cls._meta.validate:
+            validate_fields(model, dict(values, **{name: None for name in unset}))
+
+        operations = {"set__" + name: value for name, value in values.items()}
+        operations.update({"unset__" + name: 1 for name in unset})
+        operations.update(
+            {"inc__" + name: value for name, value in (inc or {}).items() if value is not None}
+        )
+        operations.update(
+            {
+                "push_all__" + name: value
+                for name, value in (push or {}).items()
+                if value is not None
+            }
+        )
+        if not operations:
+            raise ValueError("Nothing to update")
+        return model.objects(**match)._query, transform_update(model, **operations)
+
+    @classmethod
+    def get_projection(cls, info):
+        fields = cls._meta.model._fields
+        projection = {
+            fields[name].db_field: 1
+            for name in map(to_snake_case, get_query_fields(info))
+            if name in fields
+        }
+        return projection or None
+
+    @classmethod
+    def mutate(cls, root, info, input, unset=None, inc=None, push=None):
+        model = cls._meta.model
+        query, update = cls.get_update(input, unset, inc, push)
+        router = cls.get_node_type()._meta.router
+        collection = get_routed_collection(info, model, router)
+        max_time_ms = get_max_time_ms(info)
+        if cls._meta.return_document:
+            options = {} if max_time_ms is None else {"maxTimeMS": max_time_ms}
+            son = collection.find_one_and_update(
+                query,
+                update,
+                projection=cls.get_projection(info),
+                return_document=ReturnDocument.AFTER,
+                **options,
+            )
+            invalidate_counts(model)
+            invalidate_pages(model)
+            return None if son is None else model._from_son(son)
+        matched_count = collection.update_one(query, update).matched_count
+        invalidate_counts(model)
+        invalidate_pages(model)
+        if not matched_count:
+            return None
+        return with_max_time_ms(
+            get_routed_queryset(info, model, router)(__raw__=query), max_time_ms
+        ).first()
@@ -1,4 +1,4 @@
-from graphene import Enum
+from graphene import Enum, Union
 
 from graphene_mongo.utils import ExecutorEnum
 
@@ -10,6 +10,9 @@ class Registry(object):
         self._registry_string_map = {}
         self._registry_async_string_map = {}
         self._registry_enum = {}
+        self._registry_union = {}
+        # Converted fields by field identity, see converter.convert_mongoengine_field_cached
+        self._conversions = {}
 
     def register(self, cls):
         from .types import GrapheneMongoengineObjectTypes
@@ -23,6 +26,12 @@ class Registry(object):
             )
         )
         assert cls._meta.registry == self, "Registry for a Model have to match."
+        registered = self._registry.get(cls._meta.model) or self._registry_async.get(
+            cls._meta.model
+        )
+        if registered is not None and registered is not cls:
+            # Conversions may refer to the type being replaced
+            self._conversions.clear()
         if issubclass(cls, GrapheneMongoengineObjectTypes):
             self._registry[cls._meta.model] = cls
             self._registry_string_map[cls.__name__] = cls._meta.model.__name__
@@ -53,6 +62,24 @@ class Registry(object):
         else:
             return self._registry_async.get(model)
 
+    def get_union_type(self, name, types):
+        """Returns the Union named `name` of `types`, created once per registry"""
+        key = (name, types)
+        if key not in self._registry_union:
+            Meta = type("Meta", (object,), {"types": types})
+            self._registry_union[key] = type(name, (Union,), {"Meta": Meta})
+        return self._registry_union[key]
+
+    def get_converted_field(self, field, executor: ExecutorEnum = ExecutorEnum.SYNC):
+        conversion = self._conversions.get((id(field), executor))
+        # The field is kept along to keep its id from being reused
+        return conversion[1] if conversion is not None else None
+
+    def register_converted_field(
+        self, field, converted, executor: ExecutorEnum = ExecutorEnum.SYNC
+    ):
+        self._conversions[(id(field), executor)] = (field, converted)
+
     def check_enum_already_exist(self, cls):
         return cls in self._registry_enum
 
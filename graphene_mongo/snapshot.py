@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+
+import graphene
+from mongoengine.base.common import _document_registry
+
+from .advanced_types import PointFieldInputType
+
+FIELD_ATTRIBUTES = ("db_field", "required", "null", "verbose_name", "help_text", "description")
+
+# Argument types of the advance args, by name
+ADVANCE_ARG_TYPES = {"PointFieldInputType": PointFieldInputType}
+
+# Connection args computed since startup and loaded from a snapshot, by node type
+built_args = {}
+snapshot_args = {}
+
+
+def get_class_path(cls):
+    return "{}.{}".format(cls.__module__, cls.__qualname__)
+
+
+def get_models_hash(models=None):
+    """
+    Hashes the fields of the given models, all the mongoengine documents by default,
+    and the graphene-mongo version
+    """
+    from . import __version__  # imported by the package init, after this module
+
+    if models is None:
+        models = _document_registry.values()
+    definitions = []
+    for model in models:
+        fields = []
+        for name, field in model._fields.items():
+            attributes = [getattr(field, each, None) for each in FIELD_ATTRIBUTES]
+            fields.append([name, get_class_path(type(field))] + [str(each) for each in attributes])
+        definitions.append([get_class_path(model), sorted(fields)])
+    payload = json.dumps([__version__, sorted(definitions)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_type_name(_type):
+    """Name of an argument type that can be looked up again by get_arg_type, else None"""
+    _type = getattr(_type, "_type", _type)
+    if not isinstance(_type, type):
+        _type = type(_type)
+    name = _type.__name__
+    return name if get_arg_type(name) is _type else None
+
+
+def get_arg_type(name):
+    _type = ADVANCE_ARG_TYPES.get(name) or getattr(graphene, name, None)
+    return _type if isinstance(_type, type) else None
+
+
+def record_args(node_type, field_names, field_args, advance_args):
+    """
+    Records the filterable field names and the advance arg types computed for
+    `node_type`, to be written by dump_snapshot
+    """
+    advance_types = {}
+    for name, arg in advance_args.items():
+        type_name = get_type_name(arg)
+        if type_name is None:
+            return
+        advance_types[name] = type_name
+    built_args[get_class_path(node_type)] = {
+        "fields": sorted(field_names),
+        "field_args": sorted(field_args),
+        "advance_args": advance_types,
+    }
+
+
+def get_snapshot_args(node_type, field_names):
+    """
+    Returns the filterable field names and the advance arg types loaded for
+    `node_type`, None when there are none or its fields changed since
+    """
+    entry = snapshot_args.get(get_class_path(node_type))
+    if entry is None or entry["fields"] != sorted(field_names):
+        return None
+    advance_args = {}
+    for name, type_name in entry["advance_args"].items():
+        _type = get_arg_type(type_name)
+        advance_args[name] = (
+            graphene.Argument(_type) if issubclass(_type, graphene.InputObjectType) else _type()
+        )
+    return entry["field_args"], advance_args
+
+
+def dump_snapshot(path, models=None):
+    """
+    Writes the connection args computed so far, see MongoengineConnectionField.args,
+    to `path`
+
+    Args:
+        path (str): snapshot file
+        models ([mongoengine.Document]): models the snapshot is valid for, all the
+            mongoengine documents by default
+    """
+    snapshot = {"hash": get_models_hash(models), "types": dict(snapshot_args, **built_args)}
+    tmp_path = "{}.tmp".format(path)
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, models=None):
+    """
+    Loads a snapshot written by dump_snapshot, the connection fields then skip
+    converting the model fields to tell the filterable ones apart.
+
+    Returns:
+        bool: False when the file is missing or was written for other model
+            definitions or another graphene-mongo version, args are then computed
+            as usual
+    """
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if snapshot.get("hash") != get_models_hash(models):
+        return False
+    snapshot_args.clear()
+    snapshot_args.update(snapshot["types"])
+    return True
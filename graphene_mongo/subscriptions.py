@@ -0,0 +1,190 @@
+import asyncio
+from collections import OrderedDict
+
+import graphene
+from bson import json_util
+from graphene.types.argument import to_arguments
+from graphene.types.utils import get_type
+from graphene.utils.str_converters import to_snake_case
+
+from .fields import MongoengineConnectionField
+from .utils import get_query_fields, get_routed_collection
+
+DEFAULT_OPERATION_TYPES = ("insert", "update", "replace")
+
+LOGICAL_OPERATORS = ("$and", "$or", "$nor")
+
+
+def prefix_query(query, prefix):
+    """Prefixes the field names of a filter document, e.g. with `fullDocument.`"""
+    prefixed = {}
+    for key, value in query.items():
+        if key in LOGICAL_OPERATORS:
+            prefixed[key] = [prefix_query(each, prefix) for each in value]
+        elif key.startswith("$"):
+            prefixed[key] = value
+        else:
+            prefixed[prefix + key] = value
+    return prefixed
+
+
+def watch_collection(collection, pipeline):
+    return collection.watch(pipeline, full_document="updateLookup")
+
+
+class SharedChangeStream:
+    def __init__(self, stream):
+        self.stream = stream
+        self.queues = set()
+        self.task = None
+
+
+class ChangeStreamHub:
+    """
+    Shares one change stream between the subscribers watching a collection with the
+    same pipeline
+
+    Args:
+        stream_factory (callable): `(collection, pipeline)` to a change stream, an
+            object with blocking `try_next()` and `close()` methods
+    """
+
+    def __init__(self, stream_factory=None):
+        self.stream_factory = stream_factory or watch_collection
+        self.streams = {}
+
+    @staticmethod
+    def get_key(collection, pipeline):
+        return collection.full_name, json_util.dumps(pipeline, sort_keys=True)
+
+    async def pump(self, key, shared):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                pending = loop.run_in_executor(None, shared.stream.try_next)
+                try:
+                    event = await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    # try_next keeps running in the executor, the stream is closed once
+                    # it returns
+                    await asyncio.wait([pending])
+                    raise
+                if event is None:
+                    await asyncio.sleep(0)
+                    continue
+                for queue in list(shared.queues):
+                    queue.put_nowait(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # New subscribers open another stream
+            if self.streams.get(key) is shared:
+                del self.streams[key]
+            shared.stream.close()
+            for queue in list(shared.queues):
+                queue.put_nowait(error)
+
+    async def subscribe(self, collection, pipeline):
+        key = self.get_key(collection, pipeline)
+        shared = self.streams.get(key)
+        if shared is None:
+            shared = self.streams[key] = SharedChangeStream(
+                self.stream_factory(collection, pipeline)
+            )
+            shared.task = asyncio.ensure_future(self.pump(key, shared))
+        queue = asyncio.Queue()
+        shared.queues.add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            shared.queues.discard(queue)
+            if not shared.queues and self.streams.get(key) is shared:
+                del self.streams[key]
+                shared.task.cancel()
+                await asyncio.wait([shared.task])
+                shared.stream.close()
+
+
+default_hub = ChangeStreamHub()
+
+
+class MongoengineSubscriptionField(graphene.Field):
+    """
+    Subscription yielding the documents of a MongoengineObjectType as they are written
+
+    Accepts the filter arguments of MongoengineConnectionField, compiled to a `$match`
+    on the change events' `fullDocument`. Subscribers with identical filters share a
+    single change stream.
+    """
+
+    def __init__(self, type, *args, hub=None, operation_types=DEFAULT_OPERATION_TYPES, **kwargs):
+        self._hub = hub
+        self.operation_types = tuple(operation_types)
+        self._connection_field = None
+        super(MongoengineSubscriptionField, self).__init__(type, *args, **kwargs)
+
+    @property
+    def node_type(self):
+        return get_type(self._type)
+
+    @property
+    def model(self):
+        return self.node_type._meta.model
+
+    @property
+    def hub(self):
+        return self._hub or default_hub
+
+    @property
+    def connection_field(self) -> MongoengineConnectionField:
+        if self._connection_field is None:
+            self._connection_field = MongoengineConnectionField(self.node_type)
+        return self._connection_field
+
+    @property
+    def args(self):
+        args = OrderedDict(self.connection_field.args)
+        for name in ("first", "last", "before", "after"):
+            args.pop(name, None)
+        args.update(to_arguments(self._base_args or OrderedDict()))
+        return args
+
+    @args.setter
+    def args(self, args):
+        self._base_args = args
+
+    def get_pipeline(self, info, **args):
+        args = {key: value for key, value in args.items() if value is not None}
+        query = self.connection_field.get_queryset(self.model, info, **args)._query
+        match = {"operationType": {"$in": list(self.operation_types)}}
+        match.update(prefix_query(query, "fullDocument."))
+        return [{"$match": match}]
+
+    def get_projection(self, info):
+        fields = self.model._fields
+        projection = {"_id", "_cls"}
+        for name in map(to_snake_case, get_query_fields(info)):
+            if name in fields:
+                projection.add(fields[name].db_field)
+        return projection
+
+    async def subscribe(self, root, info, **args):
+        projection = self.get_projection(info)
+        collection = get_routed_collection(info, self.model, self.node_type._meta.router)
+        events = self.hub.subscribe(collection, self.get_pipeline(info, **args))
+        try:
+            async for event in events:
+                son = event.get("fullDocument")
+                if son is None:
+                    continue
+                yield self.model._from_son({key: son[key] for key in son if key in projection})
+        finally:
+            # Leaves the shared stream right away rather than when garbage collected
+            await events.aclose()
+
+    def wrap_subscribe(self, parent_subscribe):
+        return parent_subscribe or self.subscribe
@@ -0,0 +1,38 @@
+from ..cache import TTLCache, invalidate_counts
+from .models import Article, Editor
+
+
+def test_ttl_cache_expires_entries():
+    now = [0]
+    cache = TTLCache(10, clock=lambda: now[0])
+    cache.set("total", 3)
+    assert cache.get("total") == 3
+    assert cache.get_or_set("total", lambda: 4) == 3
+
+    now[0] = 10
+    assert cache.get("total") is None
+    assert cache.get_or_set("total", lambda: 4) == 4
+
+    cache.invalidate("total")
+    assert cache.get("total", 0) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_ratio == 2 / 3
+
+
+def test_invalidate_counts():
+    cache = TTLCache(10)
+    cache.set((Article, "{}"), 2)
+    cache.set((Editor, "{}"), 3)
+    invalidate_counts(Article, cache)
+    assert len(cache) == 1
+    assert cache.get((Editor, "{}")) == 3
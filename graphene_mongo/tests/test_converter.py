@@ -13,11 +13,13 @@ from .models import (
     ProfessorVector,
     Publisher,
 )
+from .utils import with_local_registry
 from .. import registry
 from .. import advanced_types
-from ..converter import convert_mongoengine_field
+from ..converter import convert_mongoengine_field, convert_mongoengine_field_cached
 from ..fields import MongoengineConnectionField
 from ..types import MongoengineObjectType
+from ..utils import ExecutorEnum
 
 
 def assert_conversion(mongoengine_field, graphene_field, *args, **kwargs):
@@ -366,3 +368,67 @@ def test_should_generic_embedded_document_convert_union():
     assert isinstance(generic_embedded_document, graphene.Field)
     assert isinstance(generic_embedded_document.type(), graphene.Union)
     assert generic_embedded_document.type()._meta.types == (D, F)
+
+
+@with_local_registry
+def test_should_memoize_scalar_conversions_as_copies():
+    local_registry = registry.get_global_registry()
+    field = mongoengine.StringField(required=True, verbose_name="Title", db_field="title")
+    field.name = "title"
+    first = convert_mongoengine_field_cached(field, local_registry)
+    second = convert_mongoengine_field_cached(field, local_registry)
+    assert isinstance(second, graphene.String)
+    assert first is not second
+    assert local_registry.get_converted_field(field, ExecutorEnum.SYNC) is not None
+    assert second.kwargs == {"description": "Title", "required": True}
+    second.kwargs["required"] = False
+    assert convert_mongoengine_field_cached(field, local_registry).kwargs["required"] is True
+
+
+@with_local_registry
+def test_should_memoize_conversions_in_registry():
+    class A(MongoengineObjectType):
+        class Meta:
+            model = Article
+
+    class E(MongoengineObjectType):
+        class Meta:
+            model = Editor
+
+    local_registry = registry.get_global_registry()
+    field = Reporter._fields["generic_reference"]
+    converted = convert_mongoengine_field_cached(field, local_registry)
+    memoized = local_registry.get_converted_field(field, ExecutorEnum.SYNC)
+    assert memoized is not None and memoized is not converted
+    assert convert_mongoengine_field_cached(field, local_registry).type is converted.type
+    assert convert_mongoengine_field(field, local_registry).type.of_type is (converted.type.of_type)
+
+    class OtherA(MongoengineObjectType):
+        class Meta:
+            model = Article
+
+    assert local_registry.get_converted_field(field, ExecutorEnum.SYNC) is None
+
+
+@with_local_registry
+def test_should_not_share_memoized_conversions_between_types():
+    class A(MongoengineObjectType):
+        class Meta:
+            model = Article
+
+    class E(MongoengineObjectType):
+        class Meta:
+            model = Editor
+
+    class R(MongoengineObjectType):
+        class Meta:
+            model = Reporter
+
+    class OtherR(MongoengineObjectType):
+        class Meta:
+            model = Reporter
+
+    assert list(OtherR._meta.fields) == list(R._meta.fields)
+    assert OtherR._meta.fields["articles"] is not R._meta.fields["articles"]
+    R._meta.fields["articles"].args["extra"] = graphene.Argument(graphene.String)
+    assert "extra" not in OtherR._meta.fields["articles"].args
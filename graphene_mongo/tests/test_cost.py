@@ -0,0 +1,119 @@
+import graphene
+from graphql import parse, validate
+
+from ..cost import cost_limit_validator
+from ..fields import MongoengineConnectionField
+from ..utils import DEFAULT_MAX_LIMIT
+from . import nodes
+
+
+class Query(graphene.ObjectType):
+    articles = MongoengineConnectionField(nodes.ArticleNode)
+    players = MongoengineConnectionField(nodes.PlayerNode, max_limit=20)
+    editors = MongoengineConnectionField(nodes.EditorNode, max_limit=0)
+    reporter = graphene.Field(nodes.ReporterNode)
+
+
+schema = graphene.Schema(query=Query)
+
+
+def get_costs(query, **kwargs):
+    costs = {}
+    rule = cost_limit_validator(callback=costs.update, **kwargs)
+    errors = validate(schema.graphql_schema, parse(query), [rule])
+    return costs, errors
+
+
+def test_should_estimate_nested_reference_cost():
+    query = """
+        query Articles {
+            articles(first: 50) {
+                edges {
+                    node {
+                        headline
+                        editor {
+                            company {
+                                name
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """
+    costs, errors = get_costs(query)
+    assert not errors
+    assert costs["Articles"].documents == 150
+    assert costs["Articles"].round_trips == 101
+
+
+def test_should_follow_fragments_and_max_limit():
+    query = """
+        query Players {
+            players(first: 1000) {
+                edges {
+                    node {
+                        ...playerFields
+                    }
+                }
+            }
+        }
+
+        fragment playerFields on PlayerNode {
+            firstName
+            opponent {
+                firstName
+            }
+        }
+    """
+    costs, errors = get_costs(query)
+    assert not errors
+    assert costs["Players"].documents == 40
+    assert costs["Players"].round_trips == 21
+
+
+def test_should_cost_unpaginated_connections():
+    query = """
+        query Lists {
+            articles {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+            }
+            editors {
+                edges {
+                    node {
+                        firstName
+                    }
+                }
+            }
+        }
+    """
+    costs, errors = get_costs(query, default_page_size=10)
+    assert not errors
+    # Capped by the default max_limit, else costed at default_page_size
+    assert costs["Lists"].documents == DEFAULT_MAX_LIMIT + 10
+
+
+def test_should_reject_operation_over_budget():
+    query = """
+        query Reporter {
+            reporter {
+                articles(first: 100) {
+                    edges {
+                        node {
+                            editor {
+                                firstName
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """
+    costs, errors = get_costs(query, max_documents=150, max_round_trips=500)
+    assert costs["Reporter"].documents == 201
+    assert len(errors) == 1
+    assert "may fetch 201 documents, the limit is 150" in errors[0].message
@@ -1,8 +1,20 @@
+from types import SimpleNamespace
+
+import graphene
 import pytest
+from bson import ObjectId
+from graphene.relay import Node
+from graphql_relay import to_global_id
+from mongoengine import Q
+from pymongo.read_preferences import ReadPreference
 
-from . import nodes, nodes_async
-from .. import AsyncMongoengineConnectionField
-from ..fields import MongoengineConnectionField
+from . import models, nodes, nodes_async
+from .utils import with_local_registry
+from .. import AsyncMongoengineConnectionField, MongoengineObjectType, aggregates
+from ..advanced_types import PointFieldInputType, PolygonFieldInputType
+from ..cache import TTLCache, invalidate_counts
+from ..fields import MongoengineConnectionField, UnindexedQueryError, estimated_counts
+from ..utils import DEFAULT_MAX_LIMIT
 
 
 def test_article_field_args():
@@ -62,3 +74,255 @@ async def test_default_resolver_connection_list_length_async(fixtures):
     connection = await field.default_resolver(None, {}, **{"first": 1})
     assert hasattr(connection, "list_length")
     assert connection.list_length == 1
+
+
+def test_index_policy_rejects_unindexed_filter(fixtures):
+    field = MongoengineConnectionField(nodes.ArticleNode, index_policy="raise")
+
+    with pytest.raises(UnindexedQueryError):
+        field.get_queryset(models.Article, None, headline="Hello")
+
+    queryset = field.get_queryset(models.Article, None, pk__in=[])
+    assert queryset._hint == -1
+
+    # Every branch of $or has to be served, $nor never is
+    queryset = models.Article.objects(Q(pk__in=[]) | Q(pk=ObjectId()))
+    assert field.apply_index_policy(queryset) is queryset
+    with pytest.raises(UnindexedQueryError):
+        field.apply_index_policy(models.Article.objects(Q(pk__in=[]) | Q(headline="Hello")))
+    with pytest.raises(UnindexedQueryError):
+        field.apply_index_policy(
+            models.Article.objects(__raw__={"$and": [{"_id": 1}, {"$nor": [{"_id": 2}]}]})
+        )
+
+
+def test_index_policy_warns_on_unindexed_sort(fixtures, caplog):
+    field = MongoengineConnectionField(nodes.ArticleNode, index_policy="warn")
+
+    queryset = field.apply_index_policy(models.Article.objects.order_by("-headline"))
+    assert queryset.count() == 3
+    assert "No index on test_article" in caplog.text
+
+
+def test_index_hint_attaches_matching_index(fixtures):
+    field = MongoengineConnectionField(nodes.ArticleNode, index_hint=True)
+
+    queryset = field.get_queryset(models.Article, None, pk__in=[])
+    assert queryset._hint == [("_id", 1)]
+
+
+def test_max_time_ms_applied_to_queryset(fixtures):
+    field = MongoengineConnectionField(nodes.ArticleNode, max_time_ms=500)
+
+    assert field.get_queryset(models.Article, None)._max_time_ms == 500
+
+    info = SimpleNamespace(context={"graphene_mongo_max_time_ms": 100})
+    assert field.get_queryset(models.Article, info)._max_time_ms <= 100
+
+
+def test_get_queryset_read_preference_kept(fixtures):
+    def get_queryset(model, info, **args):
+        return model.objects.read_preference(ReadPreference.PRIMARY)
+
+    field = MongoengineConnectionField(
+        nodes.ArticleNode, get_queryset=get_queryset, read_preference="secondaryPreferred"
+    )
+    assert field.get_queryset(models.Article, None)._read_preference == ReadPreference.PRIMARY
+
+    field = MongoengineConnectionField(
+        nodes.ArticleNode,
+        get_queryset=lambda model, info, **args: model.objects,
+        read_preference="secondaryPreferred",
+    )
+    assert (
+        field.get_queryset(models.Article, None)._read_preference
+        == ReadPreference.SECONDARY_PREFERRED
+    )
+
+
+def test_default_resolver_enforces_max_limit(fixtures):
+    field = MongoengineConnectionField(nodes.ArticleNode, max_limit=2)
+
+    connection = field.default_resolver(None, None)
+    assert connection.list_length == 2
+    assert connection.page_info.has_next_page
+
+    with pytest.raises(ValueError):
+        field.default_resolver(None, None, first=3)
+
+
+def test_default_max_limit_when_unset(fixtures):
+    field = MongoengineConnectionField(nodes.ArticleNode)
+    assert field.max_limit == DEFAULT_MAX_LIMIT
+
+    with pytest.raises(ValueError):
+        field.default_resolver(None, None, first=DEFAULT_MAX_LIMIT + 1)
+
+
+def test_max_limit_zero_lifts_the_cap(fixtures):
+    field = MongoengineConnectionField(nodes.ArticleNode, max_limit=0)
+    assert field.max_limit is None
+
+    connection = field.default_resolver(None, None, first=DEFAULT_MAX_LIMIT + 1)
+    assert connection.list_length == models.Article.objects.count()
+
+
+def test_estimated_count_for_empty_filter(fixtures):
+    estimated_counts.clear()
+    field = MongoengineConnectionField(nodes.ArticleNode, estimated_count=True)
+    total = models.Article.objects.count()
+
+    assert field.count_documents(None, {}) == total
+    models.Article(headline="Uncounted").save()
+    assert field.count_documents(None, {}) == total
+    assert field.count_documents(None, {"headline": "Uncounted"}) == 1
+    assert MongoengineConnectionField(nodes.ArticleNode).count_documents(None, {}) == total + 1
+
+
+def test_count_cache(fixtures):
+    cache = TTLCache(10)
+    field = MongoengineConnectionField(nodes.ArticleNode, count_cache=cache)
+
+    assert field.count_documents(None, {"headline": "Hello"}) == 1
+    models.Article(headline="Hello").save()
+    assert field.count_documents(None, {"headline": "Hello"}) == 1
+    assert cache.hit_ratio == 0.5
+
+    invalidate_counts(models.Article, cache)
+    assert field.count_documents(None, {"headline": "Hello"}) == 2
+
+
+def test_default_resolver_pages_without_count(fixtures, monkeypatch):
+    total = models.Article.objects.count()
+    field = MongoengineConnectionField(nodes.ArticleNode)
+    monkeypatch.setattr(field, "count_documents", None)
+
+    connection = field.default_resolver(None, None, first=total - 1)
+    assert connection.list_length == total - 1
+    assert connection.page_info.has_next_page
+
+    connection = field.default_resolver(None, None, first=total)
+    assert connection.list_length == total
+    assert not connection.page_info.has_next_page
+
+
+def test_get_order_by_appends_id_tiebreaker():
+    field = MongoengineConnectionField(nodes.ArticleNode)
+    assert field.get_order_by() == []
+    assert field.get_order_by(["-pub_date"]) == ["-pub_date", "-_id"]
+    assert field.get_order_by(["headline", "+pub_date"]) == ["headline", "+pub_date", "+_id"]
+    assert field.get_order_by(["-pk", "headline"]) == ["-pk", "headline"]
+
+
+def test_argument_plan(fixtures):
+    field = MongoengineConnectionField(nodes.PlayerNode)
+    plan = field.argument_plan
+
+    assert plan is field.argument_plan
+    assert {"first_name", "first_name__istartswith", "first_name__in"} <= plan.filterable_args
+    assert "players" not in plan.filterable_args
+
+    editor_id = to_global_id("EditorNode", "1")
+    article_plan = MongoengineConnectionField(nodes.ArticleNode).argument_plan
+    assert article_plan.count_coercers["editor"](editor_id) == "1"
+    assert article_plan.count_coercers["headline"]("Hello") == "Hello"
+    assert "first" not in article_plan.count_coercers
+
+    hydrated = article_plan.queryset_coercers["editor"]("editor", editor_id, {})
+    assert hydrated["editor"] == models.Editor(pk="1")
+
+
+@with_local_registry
+def test_geo_filter_args():
+    class ChildGeoNode(MongoengineObjectType):
+        distance = graphene.Float()
+
+        class Meta:
+            model = models.Child
+            interfaces = (Node,)
+            filter_fields = {
+                "loc": ["near", "max_distance", "min_distance", "within_box", "within_polygon"]
+            }
+
+    field = MongoengineConnectionField(ChildGeoNode, distance_field="distance")
+    args = field.filter_args
+    assert args["loc__near"].type == PointFieldInputType
+    assert args["loc__min_distance"].type == graphene.Int
+    assert args["loc__within_polygon"].type == PolygonFieldInputType
+    assert field.argument_plan.geo_filter_args == {"loc__within_box", "loc__within_polygon"}
+
+    geo_filter = field.get_geo_filter({"loc__within_box": [[0, 0], [10, 20]], "bar": "x"})
+    assert geo_filter["loc"] == {
+        "$geoWithin": {
+            "$geometry": {
+                "type": "Polygon",
+                "coordinates": [[[0, 0], [10, 0], [10, 20], [0, 20], [0, 0]]],
+            }
+        }
+    }
+    with pytest.raises(ValueError):
+        field.get_geo_filter({"loc__within_box": [[0, 0]]})
+
+    pipelines = []
+
+    class Collection:
+        def aggregate(self, pipeline, **kwargs):
+            pipelines.append(pipeline)
+            return iter(
+                [
+                    {"_id": ObjectId(), "_cls": "Parent.Child", "bar": str(i), "distance": i}
+                    for i in range(3)
+                ]
+            )
+
+    field.get_collection = lambda info=None: Collection()
+    connection = field.default_resolver(
+        None, None, first=2, loc__near={"coordinates": [1, 2]}, loc__max_distance=50
+    )
+    assert [edge.node.distance for edge in connection.edges] == [0, 1]
+    assert connection.page_info.has_next_page
+    geo_near = pipelines[0][0]["$geoNear"]
+    assert geo_near["near"] == {"type": "Point", "coordinates": [1, 2]}
+    assert geo_near["maxDistance"] == 50
+    assert geo_near["key"] == "loc"
+    assert pipelines[0][1:] == [{"$limit": 3}]
+
+    # Without a count, a `last` window needs `before`
+    with pytest.raises(ValueError, match="requires `before`"):
+        field.default_resolver(None, None, last=2, loc__near={"coordinates": [1, 2]})
+
+
+def test_aggregate_near_runs_as_geo_near(monkeypatch):
+    pipelines = []
+
+    class Collection:
+        def aggregate(self, pipeline, **kwargs):
+            pipelines.append(pipeline)
+            return iter([{"_totals": [{"_id": None, "count": 2}]}])
+
+    monkeypatch.setattr(aggregates, "with_read_preference", lambda *args: Collection())
+    queryset = models.Child.objects(
+        loc__near={"type": "Point", "coordinates": [1, 2]}, loc__max_distance=50, bar="x"
+    )
+    facets = {"_totals": [{"$group": {"_id": None, "count": {"$sum": 1}}}]}
+    assert aggregates.run_aggregate(queryset, facets) == {"count": 2}
+    geo_near = pipelines[0][0]["$geoNear"]
+    assert geo_near["near"] == {"type": "Point", "coordinates": [1, 2]}
+    assert geo_near["maxDistance"] == 50
+    assert geo_near["key"] == "loc"
+    assert geo_near["query"] == {"bar": "x", "_cls": "Parent.Child"}
+    assert pipelines[0][1:] == [{"$facet": facets}]
+
+    assert aggregates.get_match_stages({"bar": "x"}) == [{"$match": {"bar": "x"}}]
+
+
+@with_local_registry
+def test_geo_filter_args_reject_unknown_operators():
+    class CellTowerNode(MongoengineObjectType):
+        class Meta:
+            model = models.CellTower
+            interfaces = (Node,)
+            filter_fields = {"base": ["geo_within", "near"]}
+
+    with pytest.raises(ValueError):
+        _ = MongoengineConnectionField(CellTowerNode).filter_args
@@ -0,0 +1,24 @@
+from bson import ObjectId
+from graphql_relay import to_global_id
+
+from ..filters import compile_filter
+from .models import Article
+
+
+def test_compile_filter():
+    article_id = ObjectId()
+    where = {
+        "headline": {"ne_": "Hello", "exists_": True},
+        "or_": [
+            {"id": {"in_": [to_global_id("ArticleNode", str(article_id))]}},
+            {"and_": [{"headline": {"eq_": "World"}}], "not_": None},
+        ],
+        "not_": {"headline": {"eq_": None}},
+    }
+    assert compile_filter(Article, where, global_id_fields=("id",)) == {
+        "$and": [
+            {"headline": {"$ne": "Hello", "$exists": True}},
+            {"$or": [{"_id": {"$in": [article_id]}}, {"headline": {"$eq": "World"}}]},
+        ]
+    }
+    assert compile_filter(Article, {"headline": None}) == {}
@@ -1,10 +1,25 @@
 import graphene
+import mongoengine
+import mongomock
+import pymongo
 import pytest
 
 from graphene.relay import Node
+from graphql_relay import from_global_id
 
-from .models import Article, Editor
-from .nodes import ArticleNode, EditorNode
+from .models import Article, Editor, Reporter
+from .nodes import ArticleNode, EditorNode, ReporterNode
+from .types import ArticleInput, EditorWithIdInput, ReporterUpdateInput
+from ..cache import LocalCacheBackend, TTLCache
+from ..fields import MongoengineConnectionField
+from ..registry import Registry
+from ..types import MongoengineObjectType
+from ..mutations import (
+    MongoengineCreateManyMutation,
+    MongoenginePartialUpdateMutation,
+    MongoengineUpdateManyMutation,
+    MongoengineUpsertManyMutation,
+)
 
 
 @pytest.mark.asyncio
@@ -84,3 +99,313 @@ async def test_should_update(fixtures):
     # print(result.data)
     assert not result.errors
     assert result.data == expected
+
+
+@pytest.mark.asyncio
+async def test_should_bulk_create(fixtures):
+    class CreateArticles(MongoengineCreateManyMutation):
+        class Meta:
+            input_type = ArticleInput
+            node_type = ArticleNode
+
+    class Query(graphene.ObjectType):
+        node = Node.Field()
+
+    class Mutation(graphene.ObjectType):
+        create_articles = CreateArticles.Field()
+
+    query = """
+        mutation ArticlesCreator {
+            createArticles(items: [{headline: "First"}, {headline: "Second"}]) {
+                headline
+            }
+        }
+    """
+    expected = {"createArticles": [{"headline": "First"}, {"headline": "Second"}]}
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert result.data == expected
+    Article.objects(headline__in=["First", "Second"]).delete()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_invalidates_custom_count_caches(fixtures):
+    class CreateArticles(MongoengineCreateManyMutation):
+        class Meta:
+            input_type = ArticleInput
+            node_type = ArticleNode
+
+    class Query(graphene.ObjectType):
+        node = Node.Field()
+
+    class Mutation(graphene.ObjectType):
+        create_articles = CreateArticles.Field()
+
+    field = MongoengineConnectionField(ArticleNode, count_cache=TTLCache(60))
+    total = field.count_documents(None, {})
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    try:
+        result = await schema.execute_async(
+            'mutation { createArticles(items: [{headline: "Counted"}]) { headline } }'
+        )
+        assert not result.errors
+        assert field.count_documents(None, {}) == total + 1
+    finally:
+        Article.objects(headline="Counted").delete()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_uses_the_router_of_the_node_type(fixtures):
+    def tenant_router(model, info):
+        return "default", "acme_{}".format(model._get_collection_name())
+
+    class RoutedArticleNode(MongoengineObjectType):
+        class Meta:
+            model = Article
+            interfaces = (Node,)
+            registry = Registry()
+            router = tenant_router
+
+    class CreateArticles(MongoengineCreateManyMutation):
+        class Meta:
+            input_type = ArticleInput
+            node_type = RoutedArticleNode
+
+    class Query(graphene.ObjectType):
+        node = Node.Field()
+
+    class Mutation(graphene.ObjectType):
+        create_articles = CreateArticles.Field()
+
+    query = """
+        mutation ArticlesCreator {
+            createArticles(items: [{headline: "Routed"}]) {
+                headline
+            }
+        }
+    """
+    collection = mongoengine.get_db()["acme_test_article"]
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    try:
+        result = await schema.execute_async(query)
+        assert not result.errors
+        assert result.data == {"createArticles": [{"headline": "Routed"}]}
+        assert collection.count_documents({"headline": "Routed"}) == 1
+        assert not Article.objects(headline="Routed").count()
+    finally:
+        collection.delete_many({"headline": "Routed"})
+
+
+def test_bulk_update_and_upsert_writes(fixtures):
+    class UpdateEditors(MongoengineUpdateManyMutation):
+        class Meta:
+            input_type = EditorWithIdInput
+            node_type = EditorNode
+
+    class UpsertEditors(MongoengineUpsertManyMutation):
+        class Meta:
+            input_type = EditorWithIdInput
+            node_type = EditorNode
+            ordered = False
+
+    collection = Editor._get_collection()
+    try:
+        query, update, key = UpdateEditors.get_update(
+            {"id": "3", "first_name": None, "last_name": "Worm"}
+        )
+        assert key == ("3",)
+        assert not collection.update_one(query, update).upserted_id
+        editor = Editor.objects.get(id="3")
+        assert (editor.first_name, editor.last_name) == ("Dennis", "Worm")
+
+        query, update, _ = UpsertEditors.get_update(
+            {"id": "10", "first_name": "Scottie", "last_name": "Pippen"}
+        )
+        collection.update_one(query, update, upsert=True)
+        editor = Editor.objects.get(id="10")
+        assert (editor.first_name, editor.last_name) == ("Scottie", "Pippen")
+    finally:
+        Editor.objects(id="3").update(set__last_name="Rodman")
+        Editor.objects(id="10").delete()
+
+    # Upserted documents are validated as a whole, `last_name` is required
+    with pytest.raises(mongoengine.ValidationError):
+        UpsertEditors.get_write({"id": "11", "first_name": "Toni"})
+    with pytest.raises(ValueError):
+        UpdateEditors.get_write({"last_name": "Worm"})
+
+
+@pytest.mark.asyncio
+async def test_should_bulk_update_and_upsert(fixtures, monkeypatch):
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        # mongomock passes arguments pymongo's UpdateOne no longer takes
+        for request in requests:
+            if isinstance(request, pymongo.InsertOne):
+                self.insert_one(request._doc)
+            else:
+                self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+    monkeypatch.setattr(mongomock.Collection, "bulk_write", bulk_write)
+
+    class UpdateEditors(MongoengineUpdateManyMutation):
+        class Meta:
+            input_type = EditorWithIdInput
+            node_type = EditorNode
+
+    class UpsertEditors(MongoengineUpsertManyMutation):
+        class Meta:
+            input_type = EditorWithIdInput
+            node_type = EditorNode
+
+    class Query(graphene.ObjectType):
+        node = Node.Field()
+
+    class Mutation(graphene.ObjectType):
+        update_editors = UpdateEditors.Field()
+        upsert_editors = UpsertEditors.Field()
+
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    try:
+        result = await schema.execute_async(
+            """
+            mutation EditorsUpdater {
+                updateEditors(items: [{id: "3", lastName: "Worm"}, {id: "2", firstName: "G."}]) {
+                    firstName
+                    lastName
+                }
+            }
+            """
+        )
+        assert not result.errors
+        assert result.data == {
+            "updateEditors": [
+                {"firstName": "Dennis", "lastName": "Worm"},
+                {"firstName": "G.", "lastName": "Hill"},
+            ]
+        }
+
+        result = await schema.execute_async(
+            """
+            mutation EditorsUpserter {
+                upsertEditors(
+                    items: [
+                        {id: "10", firstName: "Scottie", lastName: "Pippen"}
+                        {id: "3", firstName: "Dennis", lastName: "Rodman"}
+                    ]
+                ) {
+                    id
+                    firstName
+                }
+            }
+            """
+        )
+        assert not result.errors
+        assert [each["firstName"] for each in result.data["upsertEditors"]] == [
+            "Scottie",
+            "Dennis",
+        ]
+        ids = [from_global_id(each["id"])[1] for each in result.data["upsertEditors"]]
+        assert ids == ["10", "3"]
+        assert Editor.objects.get(id="10").last_name == "Pippen"
+        assert Editor.objects.get(id="3").last_name == "Rodman"
+    finally:
+        Editor.objects(id="3").update(set__last_name="Rodman")
+        Editor.objects(id="2").update(set__first_name="Grant")
+        Editor.objects(id="10").delete()
+
+
+@pytest.mark.asyncio
+async def test_should_partially_update(fixtures):
+    class UpdateReporter(MongoenginePartialUpdateMutation):
+        class Meta:
+            input_type = ReporterUpdateInput
+            node_type = ReporterNode
+            return_document = True
+
+    class Query(graphene.ObjectType):
+        node = Node.Field()
+
+    class Mutation(graphene.ObjectType):
+        update_reporter = UpdateReporter.Field()
+
+    query = """
+        mutation ReporterUpdater {
+            updateReporter(
+                input: {id: "1", firstName: "Allen E."}
+                unset: [email]
+                push: {awards: ["2011-all-star"]}
+            ) {
+                firstName
+                lastName
+                email
+                awards
+            }
+        }
+    """
+    expected = {
+        "updateReporter": {
+            "firstName": "Allen E.",
+            "lastName": "Iverson",
+            "email": None,
+            "awards": ["2010-mvp", "2011-all-star"],
+        }
+    }
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert result.data == expected
+
+    reporter = Reporter.objects.get(id="1")
+    assert reporter.last_name == "Iverson"
+    assert reporter.email is None
+    Reporter.objects(id="1").update(
+        set__first_name="Allen", set__email="ai@gmail.com", set__awards=["2010-mvp"]
+    )
+
+    query, update = UpdateReporter.get_update({"id": "1", "email": None, "last_name": "I."})
+    assert query == {"_id": "1"}
+    assert update == {"$set": {"last_name": "I."}}
+    with pytest.raises(ValueError):
+        UpdateReporter.get_update({"id": "1"})
+
+
+@pytest.mark.asyncio
+async def test_partial_update_invalidates_cached_pages(fixtures):
+    class UpdateReporter(MongoenginePartialUpdateMutation):
+        class Meta:
+            input_type = ReporterUpdateInput
+            node_type = ReporterNode
+
+    class Query(graphene.ObjectType):
+        reporters = MongoengineConnectionField(ReporterNode, page_cache=LocalCacheBackend())
+
+    class Mutation(graphene.ObjectType):
+        update_reporter = UpdateReporter.Field()
+
+    query = """
+        query ReportersQuery {
+            reporters(first: 1) {
+                edges {
+                    node {
+                        firstName
+                    }
+                }
+            }
+        }
+    """
+    schema = graphene.Schema(query=Query, mutation=Mutation)
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert result.data["reporters"]["edges"] == [{"node": {"firstName": "Allen"}}]
+
+    result = await schema.execute_async(
+        'mutation { updateReporter(input: {id: "1", firstName: "Allen E."}) { firstName } }'
+    )
+    assert not result.errors
+    try:
+        result = await schema.execute_async(query)
+    finally:
+        Reporter.objects(id="1").update(set__first_name="Allen")
+    assert not result.errors
+    assert result.data["reporters"]["edges"] == [{"node": {"firstName": "Allen E."}}]
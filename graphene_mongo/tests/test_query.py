@@ -73,6 +73,50 @@ async def test_should_query_editor(fixtures, fixtures_dirname):
     assert result.data == expected
 
 
+@pytest.mark.asyncio
+async def test_should_query_editor_avatar_range(fixtures, fixtures_dirname):
+    class Query(graphene.ObjectType):
+        editor = graphene.Field(types.EditorType)
+
+        async def resolve_editor(self, *args, **kwargs):
+            return models.Editor.objects.first()
+
+    query = """
+        query EditorQuery {
+            editor {
+                avatar {
+                    contentType,
+                    length,
+                    head: data(length: 16),
+                    tail: data(offset: 46912)
+                }
+            }
+        }
+    """
+
+    avator_filename = os.path.join(fixtures_dirname, "image.jpg")
+    with open(avator_filename, "rb") as f:
+        data = f.read()
+
+    expected = {
+        "editor": {
+            "avatar": {
+                "contentType": "image/jpeg",
+                "length": 46928,
+                "head": base64.b64encode(data[:16]).decode("utf-8"),
+                "tail": base64.b64encode(data[46912:]).decode("utf-8"),
+            }
+        }
+    }
+
+    schema = graphene.Schema(query=Query)
+    context = {}
+    result = await schema.execute_async(query, context_value=context)
+    assert not result.errors
+    assert result.data == expected
+    assert len(context["graphene_mongo_gridfs_loader"].documents) == 1
+
+
 @pytest.mark.asyncio
 async def test_should_query_reporter(fixtures):
     class Query(graphene.ObjectType):
@@ -3,13 +3,17 @@ import json
 import os
 
 import graphene
+import mongoengine
 import pytest
 from graphene.relay import Node
 from graphql_relay.node.node import to_global_id
 
 from . import models
 from . import nodes
+from ..advanced_types import GridFSFileLoader
+from ..cache import LocalCacheBackend
 from ..fields import MongoengineConnectionField
+from ..registry import Registry
 from ..types import MongoengineObjectType
 
 
@@ -206,6 +210,374 @@ async def test_should_query_all_editors(fixtures, fixtures_dirname):
     assert result.data == expected
 
 
+@pytest.mark.asyncio
+async def test_should_batch_editor_avatar_lookups(fixtures, monkeypatch):
+    class Query(graphene.ObjectType):
+        editors = MongoengineConnectionField(nodes.EditorNode)
+
+    query = """
+        query EditorQuery {
+            editors {
+                edges {
+                    node {
+                        avatar {
+                            contentType,
+                            chunkSize,
+                            length
+                        }
+                    }
+                }
+            }
+        }
+    """
+
+    fetches = []
+    fetch = GridFSFileLoader.fetch
+
+    def counting_fetch(self, *args, **kwargs):
+        fetches.append(dict(self.pending))
+        return fetch(self, *args, **kwargs)
+
+    monkeypatch.setattr(GridFSFileLoader, "fetch", counting_fetch)
+
+    schema = graphene.Schema(query=Query)
+    result = await schema.execute_async(query, context_value={})
+    assert not result.errors
+    avatars = [edge["node"]["avatar"] for edge in result.data["editors"]["edges"]]
+    assert avatars[0] == {"contentType": "image/jpeg", "chunkSize": 261120, "length": 46928}
+    assert avatars[1:] == [{"contentType": None, "chunkSize": 0, "length": 0}] * 2
+    assert len(fetches) == 1
+
+
+@pytest.mark.asyncio
+async def test_should_order_articles_by_argument(fixtures):
+    class SortedArticleNode(MongoengineObjectType):
+        class Meta:
+            model = models.Article
+            interfaces = (Node,)
+            registry = Registry()
+            sortable_fields = ("headline", "pub_date")
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(SortedArticleNode)
+
+    query = """
+        query ArticlesQuery($orderBy: [SortedArticleNodeOrderBy!]) {
+            articles(orderBy: $orderBy, first: 2) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+            }
+        }
+    """
+
+    schema = graphene.Schema(query=Query)
+    result = await schema.execute_async(query, variables={"orderBy": ["HEADLINE_DESC"]})
+    assert not result.errors
+    headlines = [edge["node"]["headline"] for edge in result.data["articles"]["edges"]]
+    assert headlines == ["World", "Hello"]
+
+    result = await schema.execute_async(
+        query, variables={"orderBy": ["PUB_DATE_ASC", "HEADLINE_ASC"]}
+    )
+    assert not result.errors
+    headlines = [edge["node"]["headline"] for edge in result.data["articles"]["edges"]]
+    assert headlines == ["Bye", "Hello"]
+
+    result = await schema.execute_async(query, variables={"orderBy": ["EDITOR_ASC"]})
+    assert result.errors
+
+
+@pytest.mark.asyncio
+async def test_should_order_by_an_indexed_field_under_raise_policy(fixtures):
+    class Team(mongoengine.Document):
+        meta = {"collection": "test_team", "indexes": ["name"]}
+        name = mongoengine.StringField()
+
+    class TeamNode(MongoengineObjectType):
+        class Meta:
+            model = Team
+            interfaces = (Node,)
+            registry = Registry()
+            sortable_fields = ("name",)
+            order_by = "name"
+            index_policy = "raise"
+
+    class Query(graphene.ObjectType):
+        teams = MongoengineConnectionField(TeamNode)
+
+    query = """
+        query TeamsQuery($orderBy: [TeamNodeOrderBy!]) {
+            teams(orderBy: $orderBy, first: 2) {
+                edges {
+                    node {
+                        name
+                    }
+                }
+            }
+        }
+    """
+
+    Team.objects.insert([Team(name=name) for name in ("Bulls", "Celtics", "Bulls")])
+    schema = graphene.Schema(query=Query)
+    try:
+        result = await schema.execute_async(query)
+        assert not result.errors
+        names = [edge["node"]["name"] for edge in result.data["teams"]["edges"]]
+        assert names == ["Bulls", "Bulls"]
+
+        result = await schema.execute_async(query, variables={"orderBy": ["NAME_DESC"]})
+        assert not result.errors
+        names = [edge["node"]["name"] for edge in result.data["teams"]["edges"]]
+        assert names == ["Celtics", "Bulls"]
+    finally:
+        Team.drop_collection()
+
+
+@pytest.mark.asyncio
+async def test_should_filter_articles_with_where(fixtures):
+    class FilteredArticleNode(MongoengineObjectType):
+        class Meta:
+            model = models.Article
+            interfaces = (Node,)
+            registry = Registry()
+            filter_input = True
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(FilteredArticleNode)
+
+    query = """
+        query ArticlesQuery($where: FilteredArticleNodeFilterInput) {
+            articles(where: $where, last: 5) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+            }
+        }
+    """
+
+    schema = graphene.Schema(query=Query)
+    where = {
+        "or": [{"headline": {"eq": "Hello"}}, {"headline": {"in": ["Bye", "Nope"]}}],
+        "not": {"headline": {"eq": "Bye"}},
+    }
+    result = await schema.execute_async(query, variables={"where": where})
+    assert not result.errors
+    headlines = [edge["node"]["headline"] for edge in result.data["articles"]["edges"]]
+    assert headlines == ["Hello"]
+
+
+@pytest.mark.asyncio
+async def test_should_aggregate_articles(fixtures):
+    class AggregatedArticleNode(MongoengineObjectType):
+        class Meta:
+            model = models.Article
+            interfaces = (Node,)
+            registry = Registry()
+            filter_fields = {"headline": ["in"]}
+            aggregate_fields = ("headline", "editor")
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(AggregatedArticleNode)
+
+    query = """
+        query ArticlesQuery {
+            articles(headline_In: ["Hello", "World"], first: 1) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+                aggregate {
+                    count
+                    first: min(field: HEADLINE)
+                    editors: groupBy(field: EDITOR) {
+                        count
+                    }
+                }
+            }
+        }
+    """
+
+    schema = graphene.Schema(query=Query)
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert len(result.data["articles"]["edges"]) == 1
+    assert result.data["articles"]["aggregate"] == {
+        "count": 2,
+        "first": "Hello",
+        "editors": [{"count": 1}, {"count": 1}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_should_aggregate_on_a_declared_connection(fixtures):
+    class ArticleConnection(graphene.relay.Connection):
+        class Meta:
+            node = nodes.ArticleNode
+
+        label = graphene.String()
+
+        def resolve_label(self, info):
+            return "articles"
+
+    class AggregatedArticleNode(MongoengineObjectType):
+        class Meta:
+            model = models.Article
+            interfaces = (Node,)
+            registry = Registry()
+            connection = ArticleConnection
+            aggregate_fields = ("headline",)
+
+    connection = AggregatedArticleNode._meta.connection
+    assert issubclass(connection, ArticleConnection)
+    assert "aggregate" not in ArticleConnection._meta.fields
+    assert list(connection._meta.fields) == ["page_info", "edges", "label", "aggregate"]
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(AggregatedArticleNode)
+
+    query = """
+        query ArticlesQuery {
+            articles(first: 1) {
+                label
+                aggregate {
+                    count
+                }
+            }
+        }
+    """
+
+    schema = graphene.Schema(query=Query)
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert result.data["articles"]["label"] == "articles"
+    assert result.data["articles"]["aggregate"] == {"count": models.Article.objects.count()}
+
+
+@pytest.mark.asyncio
+async def test_should_route_articles_per_request(fixtures):
+    def tenant_router(model, info):
+        return "default", "{}_{}".format(info.context.tenant, model._get_collection_name())
+
+    mongoengine.get_db()["acme_test_article"].insert_one(models.Article(headline="Acme").to_mongo())
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(nodes.ArticleNode)
+
+    query = """
+        query ArticlesQuery {
+            articles(last: 2) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+            }
+        }
+    """
+
+    schema = graphene.Schema(query=Query)
+    result = await schema.execute_async(
+        query, context_value=graphene.Context(tenant="acme", graphene_mongo_router=tenant_router)
+    )
+    assert not result.errors
+    assert result.data["articles"]["edges"] == [{"node": {"headline": "Acme"}}]
+
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert len(result.data["articles"]["edges"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_should_serve_cached_pages(fixtures):
+    backend = LocalCacheBackend()
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(nodes.ArticleNode, page_cache=backend)
+
+    query = """
+        query ArticlesQuery {
+            articles(first: 1) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                }
+            }
+        }
+    """
+    expected = {
+        "articles": {
+            "edges": [{"node": {"headline": "Hello"}}],
+            "pageInfo": {"hasNextPage": True},
+        }
+    }
+
+    schema = graphene.Schema(query=Query)
+    result = await schema.execute_async(query)
+    assert not result.errors
+    assert result.data == expected
+
+    models.Article.objects(headline="Hello").update(set__headline="Updated")
+    try:
+        result = await schema.execute_async(query)
+    finally:
+        models.Article.objects(headline="Updated").update(set__headline="Hello")
+    assert not result.errors
+    assert result.data == expected
+
+
+@pytest.mark.asyncio
+async def test_should_not_share_cached_pages_across_get_queryset_requests(fixtures):
+    def get_queryset(model, info, **args):
+        return model.objects(headline__startswith=info.context.user)
+
+    class Query(graphene.ObjectType):
+        articles = MongoengineConnectionField(
+            nodes.ArticleNode, get_queryset=get_queryset, page_cache=LocalCacheBackend()
+        )
+        keyed_articles = MongoengineConnectionField(
+            nodes.ArticleNode,
+            get_queryset=get_queryset,
+            page_cache=LocalCacheBackend(),
+            page_cache_key=lambda info: info.context.user,
+        )
+
+    query = """
+        query ArticlesQuery {
+            articles(first: 1) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+            }
+            keyedArticles(first: 1) {
+                edges {
+                    node {
+                        headline
+                    }
+                }
+            }
+        }
+    """
+
+    schema = graphene.Schema(query=Query)
+    for user, headline in (("H", "Hello"), ("W", "World"), ("H", "Hello")):
+        result = await schema.execute_async(query, context_value=graphene.Context(user=user))
+        assert not result.errors
+        edges = [{"node": {"headline": headline}}]
+        assert result.data == {"articles": {"edges": edges}, "keyedArticles": {"edges": edges}}
+
+
 @pytest.mark.asyncio
 async def test_should_query_editors_with_dataloader(fixtures):
     from promise import Promise
@@ -0,0 +1,45 @@
+import json
+
+from .. import fields, snapshot
+from ..fields import MongoengineConnectionField
+from ..snapshot import dump_snapshot, get_models_hash, load_snapshot
+from . import nodes
+from .models import Article, Editor, Reporter
+
+
+def test_should_reuse_snapshot_args(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.json")
+    built = MongoengineConnectionField(nodes.ArticleNode).args
+    dump_snapshot(path, [Article, Editor, Reporter])
+
+    snapshot_args = dict(snapshot.snapshot_args)
+    try:
+        assert load_snapshot(path, [Article, Editor, Reporter])
+
+        def convert(*args, **kwargs):
+            raise AssertionError("Converted a field covered by the snapshot")
+
+        monkeypatch.setattr(fields, "convert_mongoengine_field_cached", convert)
+        args = MongoengineConnectionField(nodes.ArticleNode).args
+        assert set(args) == set(built)
+        assert {name: str(arg.type) for name, arg in args.items()} == {
+            name: str(arg.type) for name, arg in built.items()
+        }
+        assert str(args["headline"].type) == "String"
+        assert str(args["editor"].type) == "ID"
+    finally:
+        snapshot.snapshot_args.clear()
+        snapshot.snapshot_args.update(snapshot_args)
+
+
+def test_should_not_load_stale_snapshot(tmp_path):
+    path = tmp_path / "snapshot.json"
+    dump_snapshot(str(path), [Article])
+    assert get_models_hash([Article]) != get_models_hash([Article, Reporter])
+    assert not load_snapshot(str(path), [Article, Reporter])
+    assert not load_snapshot(str(tmp_path / "missing.json"), [Article])
+
+    data = json.loads(path.read_text())
+    data["hash"] = "stale"
+    path.write_text(json.dumps(data))
+    assert not load_snapshot(str(path), [Article])
@@ -0,0 +1,119 @@
+import asyncio
+import queue
+
+import graphene
+import pytest
+
+from ..subscriptions import ChangeStreamHub, MongoengineSubscriptionField, prefix_query
+from . import nodes
+
+
+class InProcessChangeStream:
+    def __init__(self):
+        self.events = queue.Queue()
+        self.closed = False
+        self.reading = False
+        self.closed_while_reading = False
+
+    def try_next(self):
+        self.reading = True
+        try:
+            event = self.events.get(timeout=0.01)
+        except queue.Empty:
+            return None
+        finally:
+            self.reading = False
+        if isinstance(event, Exception):
+            raise event
+        return event
+
+    def close(self):
+        self.closed_while_reading = self.reading
+        self.closed = True
+
+
+def test_prefix_query():
+    query = {"headline": "Hello", "$or": [{"editor": "1"}, {"reporter": "1"}]}
+    assert prefix_query(query, "fullDocument.") == {
+        "fullDocument.headline": "Hello",
+        "$or": [{"fullDocument.editor": "1"}, {"fullDocument.reporter": "1"}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_should_subscribe_to_changes(fixtures):
+    streams = []
+
+    def stream_factory(collection, pipeline):
+        stream = InProcessChangeStream()
+        streams.append((stream, pipeline))
+        return stream
+
+    hub = ChangeStreamHub(stream_factory=stream_factory)
+
+    class Query(graphene.ObjectType):
+        noop = graphene.String()
+
+    class Subscription(graphene.ObjectType):
+        players = MongoengineSubscriptionField(nodes.PlayerNode, hub=hub)
+
+    schema = graphene.Schema(query=Query, subscription=Subscription)
+    query = 'subscription { players(firstName_Istartswith: "Mic") { firstName } }'
+    first = await schema.subscribe(query)
+    second = await schema.subscribe(query)
+    first_result = asyncio.ensure_future(first.__anext__())
+    second_result = asyncio.ensure_future(second.__anext__())
+    await asyncio.sleep(0.05)
+
+    assert len(streams) == 1
+    stream, pipeline = streams[0]
+    match = pipeline[0]["$match"]
+    assert match["operationType"] == {"$in": ["insert", "update", "replace"]}
+    assert match["fullDocument.first_name"].pattern == "^Mic"
+
+    stream.events.put(
+        {
+            "operationType": "insert",
+            "fullDocument": {"_id": "1", "first_name": "Michael", "last_name": "Jordan"},
+        }
+    )
+    for result in await asyncio.wait_for(asyncio.gather(first_result, second_result), 1):
+        assert not result.errors
+        assert result.data == {"players": {"firstName": "Michael"}}
+
+    await first.aclose()
+    await second.aclose()
+    assert stream.closed
+    assert not stream.closed_while_reading
+    assert not hub.streams
+
+
+@pytest.mark.asyncio
+async def test_should_drop_failed_change_streams():
+    streams = []
+
+    def stream_factory(collection, pipeline):
+        streams.append(InProcessChangeStream())
+        return streams[-1]
+
+    class Collection:
+        full_name = "db.test_player"
+
+    hub = ChangeStreamHub(stream_factory=stream_factory)
+    events = hub.subscribe(Collection(), [])
+    event = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0.05)
+    streams[0].events.put(RuntimeError("stream failed"))
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(event, 1)
+    assert streams[0].closed
+    assert not hub.streams
+
+    events = hub.subscribe(Collection(), [])
+    event = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0.05)
+    assert len(streams) == 2
+    event.cancel()
+    await asyncio.wait([event])
+    assert streams[1].closed
+    assert not streams[1].closed_while_reading
@@ -235,3 +235,56 @@ def test_filter_list_types():
         "id",
         "subjects",
     }
+
+
+@with_local_registry
+def test_mongoengine_objecttype_data_resolvers():
+    class A(MongoengineObjectType):
+        class Meta:
+            model = Article
+
+        def resolve_pub_date(self, info):
+            return None
+
+    headline = A._meta.fields["headline"]
+    assert headline.resolver is not None
+    assert A._meta.fields["pub_date"].resolver is None
+
+    assert headline.resolver(Article(headline="Hello"), None) == "Hello"
+    assert headline.resolver({"headline": "From dict"}, None) == "From dict"
+
+
+@with_local_registry
+def test_mongoengine_objecttype_lazy():
+    class A(MongoengineObjectType):
+        extra = Int()
+
+        class Meta:
+            model = Article
+            lazy = True
+
+    assert A._meta.field_builder is not None
+    fields = A._meta.fields
+    assert A._meta.field_builder is None
+    assert fields["extra"].type == Int
+    assert "headline" in fields
+    assert "reporter" in fields
+    assert fields["headline"].resolver is not None
+    assert A._meta.fields is fields
+
+
+def test_mongoengine_objecttype_lazy_init():
+    class A(MongoengineObjectType):
+        extra = Int()
+
+        class Meta:
+            model = Article
+            lazy = True
+
+    assert A._meta.field_builder is not None
+    a = A(headline="x", extra=1)
+    assert A._meta.field_builder is None
+    assert a.headline == "x"
+    assert a.extra == 1
+    assert a.reporter is None
+    assert A(headline="x", extra=1) == a
@@ -1,8 +1,37 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
 import graphene
+import mongoengine
+import pytest
+from pymongo.errors import ExecutionTimeout
+from pymongo.read_preferences import ReadPreference
 
 from . import types
-from .models import Article, Child, Reporter
-from ..utils import get_model_fields, get_query_fields, is_valid_mongoengine_model
+from .models import Article, Child, EmbeddedArticle, Reporter
+from ..utils import (
+    DEFAULT_MAX_LIMIT,
+    BlockingCallBatcher,
+    count_by_ids,
+    fetch_page,
+    fetch_window,
+    find_index_for_query,
+    get_filter_key_sets,
+    find_skip_and_limit,
+    gather_with_deadline,
+    get_max_time_ms,
+    get_model_fields,
+    get_model_indexes,
+    get_query_fields,
+    get_read_preference,
+    get_reversed_ordering,
+    get_routed_queryset,
+    is_valid_mongoengine_model,
+    sync_to_async,
+    with_read_preference,
+)
 
 
 def test_get_model_fields_no_duplication():
@@ -102,3 +131,183 @@ def test_get_query_fields():
             "qux": {},
         },
     }
+
+
+def test_get_model_indexes():
+    assert get_model_indexes(Article) == ((("_id", 1),),)
+    assert (("loc", "2dsphere"),) in get_model_indexes(Child)
+    assert get_model_indexes(EmbeddedArticle) == ()
+
+
+def test_find_index_for_query():
+    indexes = ((("_id", 1),), (("fname", 1), ("lname", -1)))
+    assert find_index_for_query(indexes, ["fname", "lname"]) == indexes[1]
+    assert find_index_for_query(indexes, ["lname"]) is None
+    assert find_index_for_query(indexes, [], [("fname", -1), ("lname", 1)]) == indexes[1]
+    assert find_index_for_query(indexes, [], [("fname", 1), ("lname", 1)]) is None
+    assert (
+        find_index_for_query(indexes, [], [("fname", -1), ("lname", 1), ("_id", -1)])
+        == (indexes[1])
+    )
+
+
+def test_get_filter_key_sets():
+    assert get_filter_key_sets({}) == [set()]
+    assert get_filter_key_sets({"a": 1, "$and": [{"b": 1}, {"c": 1}]}) == [{"a", "b", "c"}]
+    assert get_filter_key_sets({"a": 1, "$or": [{"b": 1}, {"c": 1, "$and": [{"d": 1}]}]}) == [
+        {"a", "b"},
+        {"a", "c", "d"},
+    ]
+    assert get_filter_key_sets({"$and": [{"$or": [{"a": 1}, {"$nor": [{"b": 1}]}]}]}) is None
+
+
+def test_get_max_time_ms():
+    info = SimpleNamespace(context={"graphene_mongo_max_time_ms": 1000})
+    assert get_max_time_ms(None, 50) == 50
+    assert get_max_time_ms(info, 50) == 50
+    assert 0 < get_max_time_ms(info) <= 1000
+    assert "graphene_mongo_deadline" in info.context
+
+    info.context["graphene_mongo_deadline"] = time.monotonic() - 1
+    with pytest.raises(ExecutionTimeout):
+        get_max_time_ms(info, 50)
+
+
+def test_get_read_preference():
+    info = SimpleNamespace(context={})
+    assert get_read_preference(info) is None
+    assert get_read_preference(info, "secondary") == ReadPreference.SECONDARY
+
+    info.context["graphene_mongo_read_preference"] = ReadPreference.PRIMARY_PREFERRED
+    assert get_read_preference(info, "secondary") == ReadPreference.PRIMARY_PREFERRED
+
+    queryset = with_read_preference(Article.objects, get_read_preference(info))
+    assert queryset._read_preference == ReadPreference.PRIMARY_PREFERRED
+    assert with_read_preference(Article.objects, None)._read_preference is None
+
+
+@pytest.mark.asyncio
+async def test_gather_with_deadline_cancels_pending_tasks():
+    task = asyncio.ensure_future(asyncio.sleep(10))
+    with pytest.raises(ExecutionTimeout):
+        await gather_with_deadline([task], 10)
+    await asyncio.sleep(0)
+    assert task.cancelled()
+
+
+def test_find_skip_and_limit_max_limit():
+    assert find_skip_and_limit(first=None, last=None, after=None, before=None, max_limit=10) == (
+        0,
+        10,
+    )
+    assert find_skip_and_limit(first=5, last=None, after=None, before=None, max_limit=10) == (
+        0,
+        5,
+    )
+    with pytest.raises(ValueError):
+        find_skip_and_limit(first=11, last=None, after=None, before=None, max_limit=10)
+    with pytest.raises(ValueError):
+        find_skip_and_limit(first=None, last=11, after=None, before=None, count=20, max_limit=10)
+
+
+def test_find_skip_and_limit_default_max_limit():
+    assert find_skip_and_limit(first=None, last=None, after=None, before=None) == (
+        0,
+        DEFAULT_MAX_LIMIT,
+    )
+    with pytest.raises(ValueError):
+        find_skip_and_limit(first=DEFAULT_MAX_LIMIT + 1, last=None, after=None, before=None)
+
+
+def test_find_skip_and_limit_last_before_without_count():
+    assert find_skip_and_limit(first=None, last=2, after=None, before=5) == (3, 2)
+    with pytest.raises(ValueError):
+        find_skip_and_limit(first=None, last=2, after=None, before=None)
+
+
+def test_fetch_window_from_end(fixtures):
+    queryset = Article.objects.order_by("headline")
+    assert get_reversed_ordering(queryset) == [("headline", -1), ("_id", -1)]
+    assert get_reversed_ordering(Article.objects) is None
+
+    count = count_by_ids(queryset)
+    assert count == 3
+    window = fetch_window(queryset.skip(1).limit(5), count)
+    assert [article.headline for article in window] == ["Hello", "World"]
+    assert fetch_window(queryset.skip(0).limit(1), count) == list(queryset.limit(1))
+
+    documents, has_next_page = fetch_page(queryset.skip(0).limit(2))
+    assert len(documents) == 2 and has_next_page
+    documents, has_next_page = fetch_page(queryset.skip(1).limit(2))
+    assert len(documents) == 2 and not has_next_page
+
+
+def test_fetch_window_with_tied_sort_keys(fixtures):
+    pub_date = Article.objects.first().pub_date
+    extra = Article(headline="Tied", pub_date=pub_date).save()
+    try:
+        queryset = Article.objects(pub_date=pub_date).order_by("pub_date")
+        count = queryset.count()
+        assert count >= 4
+        windows = [fetch_window(queryset.skip(skip).limit(1), count)[0] for skip in range(count)]
+    finally:
+        extra.delete()
+    assert len({article.pk for article in windows}) == count
+
+
+def test_get_routed_queryset_applies_queryset_manager(fixtures):
+    class Note(mongoengine.Document):
+        meta = {"collection": "test_note"}
+        text = mongoengine.StringField()
+        deleted = mongoengine.BooleanField(default=False)
+
+        @mongoengine.queryset_manager
+        def objects(doc_cls, queryset):
+            return queryset.filter(deleted=False)
+
+    def router(model, info):
+        return "default", "acme_{}".format(model._get_collection_name())
+
+    collection = mongoengine.get_db()["acme_test_note"]
+    collection.insert_many(
+        [{"text": "Kept", "deleted": False}, {"text": "Deleted", "deleted": True}]
+    )
+    try:
+        notes = get_routed_queryset(None, Note, router)
+        assert [note.text for note in notes] == ["Kept"]
+    finally:
+        collection.drop()
+
+
+@pytest.mark.asyncio
+async def test_sync_to_async_batches_calls():
+    def get_thread(value):
+        if value is None:
+            raise ValueError("Missing value")
+        return value, threading.get_ident()
+
+    results = await asyncio.gather(
+        *(sync_to_async(get_thread)(value) for value in range(3)),
+        sync_to_async(get_thread)(None),
+        return_exceptions=True,
+    )
+    assert [result[0] for result in results[:3]] == [0, 1, 2]
+    assert len({result[1] for result in results[:3]}) == 1
+    assert results[1][1] != threading.get_ident()
+    assert isinstance(results[3], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_batched_calls_settle_on_base_exceptions():
+    class Interrupt(BaseException):
+        pass
+
+    def interrupt():
+        raise Interrupt()
+
+    batcher = BlockingCallBatcher()
+    futures = [batcher.submit(interrupt), batcher.submit(time.time)]
+    done, _ = await asyncio.wait(futures, timeout=1)
+    assert len(done) == 2
+    for future in futures:
+        assert isinstance(future.exception(), Interrupt)
@@ -93,3 +93,17 @@ class EditorInput(MongoengineInputType):
         only_fields = ["first_name", "last_name"]
         # allow providing only one of those ! Even None...
         non_required_fields = ["first_name", "last_name"]
+
+
+class EditorWithIdInput(MongoengineInputType):
+    class Meta:
+        model = models.Editor
+        only_fields = ["id", "first_name", "last_name"]
+        non_required_fields = ["first_name", "last_name"]
+
+
+class ReporterUpdateInput(MongoengineInputType):
+    class Meta:
+        model = models.Reporter
+        only_fields = ["id", "first_name", "last_name", "email", "awards"]
+        non_required_fields = ["first_name", "last_name"]
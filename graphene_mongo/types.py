@@ -1,4 +1,6 @@
 from collections import OrderedDict
+from dataclasses import field as dataclass_field
+from dataclasses import make_dataclass
 
 import graphene
 import mongoengine
@@ -10,14 +12,22 @@ from graphene.types.utils import yank_fields_from_attrs
 from graphene.utils.str_converters import to_snake_case
 
 from graphene_mongo import MongoengineConnectionField
-from .converter import convert_mongoengine_field
+from .aggregates import construct_aggregate_field, with_aggregate_field
+from .converter import convert_mongoengine_field_cached
+from .field_resolvers import DataFieldResolver
 from .registry import Registry, get_global_registry, get_inputs_registry
 from .utils import (
     ExecutorEnum,
+    get_max_time_ms,
     get_model_fields,
+    get_model_indexes,
     get_query_fields,
+    get_read_preference,
+    get_routed_queryset,
     is_valid_mongoengine_model,
     sync_to_async,
+    with_max_time_ms,
+    with_read_preference,
 )
 
 
@@ -63,7 +73,7 @@ def construct_fields(
             ):
                 self_referenced[name] = field
                 continue
-        converted = convert_mongoengine_field(field, registry, executor)
+        converted = convert_mongoengine_field_cached(field, registry, executor)
         if not converted:
             continue
         else:
@@ -77,7 +87,7 @@ def construct_fields(
 def construct_self_referenced_fields(self_referenced, registry, executor=ExecutorEnum.SYNC):
     fields = OrderedDict()
     for name, field in self_referenced.items():
-        converted = convert_mongoengine_field(field, registry, executor)
+        converted = convert_mongoengine_field_cached(field, registry, executor)
         if not converted:
             continue
         fields[name] = converted
@@ -85,16 +95,164 @@ def construct_self_referenced_fields(self_referenced, registry, executor=Executo
     return fields
 
 
+def construct_data_resolvers(cls, model, converted_fields, mongoengine_fields):
+    """
+    Attaches resolvers reading `_data` directly to the scalar fields whose mongoengine
+    field uses the plain `BaseField.__get__` descriptor and have no `resolve_<name>`.
+
+    Args:
+        cls (MongoengineObjectType):
+        model (mongoengine.Document):
+        converted_fields (OrderedDict): unmounted fields from construct_fields
+        mongoengine_fields (OrderedDict): the same fields, mounted
+    """
+    for name, converted in converted_fields.items():
+        field = mongoengine_fields.get(name)
+        model_field = model._fields.get(name)
+        if (
+            not isinstance(converted, graphene.Scalar)
+            or not isinstance(field, graphene.Field)
+            or field.resolver is not None
+            or getattr(cls, "resolve_{}".format(name), None) is not None
+            or type(model_field).__get__ is not mongoengine.base.BaseField.__get__
+        ):
+            continue
+        field.resolver = DataFieldResolver.data_resolver(name)
+
+
+class LazyFieldsOptions:
+    """
+    Options whose `fields` are built by `field_builder` on first access once the type
+    is ready, the declared fields taking precedence over the built ones
+    """
+
+    field_builder = None
+
+    def build_fields(self):
+        builder = self.__dict__.get("field_builder")
+        if builder is not None and self.__dict__.get("ready"):
+            # Options are frozen by now
+            self.__dict__["field_builder"] = None
+            fields = builder()
+            fields.update(self.__dict__.get("_fields") or {})
+            self.__dict__["_fields"] = fields
+            lazy_type = self.__dict__.get("lazy_type")
+            if lazy_type is not None:
+                construct_object_type_init(lazy_type, fields)
+        return self.__dict__.get("_fields")
+
+    @property
+    def fields(self):
+        return self.build_fields()
+
+    @fields.setter
+    def fields(self, fields):
+        self.__dict__["_fields"] = fields
+
+
+def create_lazy_fields_metaclass(object_type):
+    class LazyFieldsMeta(type(object_type)):
+        def __new__(mcs, *args, **kwargs):
+            cls = super(LazyFieldsMeta, mcs).__new__(mcs, *args, **kwargs)
+            # graphene reads the fields while creating the class, build them later on
+            if isinstance(cls._meta, LazyFieldsOptions):
+                cls._meta.__dict__["ready"] = True
+                if cls._meta.field_builder is not None and issubclass(cls, ObjectType):
+                    cls._meta.__dict__["lazy_type"] = cls
+                    construct_lazy_object_type_init(cls)
+            return cls
+
+    return LazyFieldsMeta
+
+
+def get_object_type_init_base(cls):
+    # graphene puts the keyword constructor on the first base of an ObjectType
+    return cls.__bases__[0]
+
+
+def construct_object_type_init(cls, fields):
+    """
+    Rebuilds the keyword constructor graphene derives from the fields of an ObjectType
+    when the class is created, for fields built after that
+    """
+    dataclass = make_dataclass(
+        cls.__name__,
+        [
+            (
+                name,
+                "typing.Any",
+                dataclass_field(default=getattr(field, "default_value", None)),
+            )
+            for name, field in fields.items()
+        ],
+        bases=(),
+    )
+    base = get_object_type_init_base(cls)
+    base.__init__ = dataclass.__init__
+    base.__eq__ = dataclass.__eq__
+    base.__repr__ = dataclass.__repr__
+
+
+def construct_lazy_object_type_init(cls):
+    base = get_object_type_init_base(cls)
+
+    def __init__(self, *args, **kwargs):
+        # Building the fields replaces this constructor
+        cls._meta.build_fields()
+        base.__init__(self, *args, **kwargs)
+
+    base.__init__ = __init__
+
+
+def construct_order_by_enum(name, model, sortable_fields):
+    """
+    Args:
+        name (str): name of the enum
+        model (mongoengine.Document):
+        sortable_fields ([str]): fields clients may sort on
+
+    Returns:
+        graphene.Enum: with a `<FIELD>_ASC` and a `<FIELD>_DESC` value per field, their
+            values being mongoengine sort keys
+    """
+    values = []
+    for field in sortable_fields:
+        assert field in model._fields, 'The sortable field "{}" is not a field of {}.'.format(
+            field, model.__name__
+        )
+        values.append(("{}_ASC".format(field.upper()), "+" + field))
+        values.append(("{}_DESC".format(field.upper()), "-" + field))
+    return graphene.Enum(name, values)
+
+
 def create_graphene_generic_class(object_type, option_type):
-    class MongoengineGenericObjectTypeOptions(option_type):
+    class MongoengineGenericObjectTypeOptions(LazyFieldsOptions, option_type):
         model = None
         registry = None  # type: Registry
         connection = None
         filter_fields = ()
         non_required_fields = ()
         order_by = None
-
-    class GrapheneMongoengineGenericType(object_type):
+        indexes = ()
+        index_policy = None
+        index_hint = False
+        max_time_ms = None
+        max_limit = None
+        read_preference = None
+        router = None
+        estimated_count = False
+        count_cache = None
+        page_cache = None
+        page_cache_ttl = None
+        page_cache_key = None
+        sortable_fields = ()
+        order_by_enum = None
+        filter_input = False
+        aggregate_fields = ()
+
+    class GrapheneMongoengineGenericType(
+        object_type, metaclass=create_lazy_fields_metaclass(object_type)
+    ):
         @classmethod
         def __init_subclass_with_meta__(
             cls,
@@ -114,6 +272,21 @@ def create_graphene_generic_class(object_type, option_type):
             interfaces=(),
             _meta=None,
             order_by=None,
+            index_policy=None,
+            index_hint=False,
+            max_time_ms=None,
+            max_limit=None,
+            read_preference=None,
+            router=None,
+            estimated_count=False,
+            count_cache=None,
+            page_cache=None,
+            page_cache_ttl=None,
+            page_cache_key=None,
+            lazy=False,
+            sortable_fields=(),
+            filter_input=False,
+            aggregate_fields=(),
             **options,
         ):
             assert is_valid_mongoengine_model(model), (
@@ -132,10 +305,16 @@ def create_graphene_generic_class(object_type, option_type):
                 "The attribute registry in {}.Meta needs to be an instance of "
                 'Registry({}), received "{}".'
             ).format(object_type, cls.__name__, registry)
-            converted_fields, self_referenced = construct_fields(
-                model, registry, only_fields, exclude_fields, non_required_fields
-            )
+            if lazy:
+                # Converted on first access to _meta.fields, see construct_lazy_fields
+                converted_fields, self_referenced = OrderedDict(), OrderedDict()
+            else:
+                converted_fields, self_referenced = construct_fields(
+                    model, registry, only_fields, exclude_fields, non_required_fields
+                )
             mongoengine_fields = yank_fields_from_attrs(converted_fields, _as=graphene.Field)
+            if issubclass(cls, ObjectType):
+                construct_data_resolvers(cls, model, converted_fields, mongoengine_fields)
             if use_connection is None and interfaces:
                 use_connection = any((issubclass(interface, Node) for interface in interfaces))
 
@@ -153,6 +332,13 @@ def create_graphene_generic_class(object_type, option_type):
                     "The attribute connection in {}.Meta must be of type Connection. "
                     'Received "{}" instead.'
                 ).format(cls.__name__, type(connection))
+                if aggregate_fields:
+                    connection = with_aggregate_field(
+                        connection,
+                        construct_aggregate_field(
+                            options.get("name") or cls.__name__, model, aggregate_fields
+                        ),
+                    )
 
             if connection_field_class is not None:
                 assert issubclass(connection_field_class, graphene.ConnectionField), (
@@ -182,6 +368,28 @@ def create_graphene_generic_class(object_type, option_type):
             _meta.exclude_fields = exclude_fields
             _meta.non_required_fields = non_required_fields
             _meta.order_by = order_by
+            _meta.indexes = get_model_indexes(model)
+            _meta.index_policy = index_policy
+            _meta.index_hint = index_hint
+            _meta.max_time_ms = max_time_ms
+            _meta.max_limit = max_limit
+            _meta.read_preference = read_preference
+            _meta.router = router
+            _meta.estimated_count = estimated_count
+            _meta.count_cache = count_cache
+            _meta.page_cache = page_cache
+            _meta.page_cache_ttl = page_cache_ttl
+            _meta.page_cache_key = page_cache_key
+            _meta.sortable_fields = tuple(sortable_fields)
+            _meta.filter_input = filter_input
+            _meta.aggregate_fields = tuple(aggregate_fields)
+            if sortable_fields:
+                _meta.order_by_enum = construct_order_by_enum(
+                    "{}OrderBy".format(options.get("name") or cls.__name__),
+                    model,
+                    sortable_fields,
+                )
+            _meta.field_builder = cls.construct_lazy_fields if lazy else None
 
             super(GrapheneMongoengineGenericType, cls).__init_subclass_with_meta__(
                 _meta=_meta, interfaces=interfaces, **options
@@ -198,14 +406,43 @@ def create_graphene_generic_class(object_type, option_type):
                     cls._meta.fields.update(mongoengine_fields)
                     registry.register(cls)
 
+        @classmethod
+        def construct_lazy_fields(cls):
+            converted_fields, self_referenced = construct_fields(
+                cls._meta.model,
+                cls._meta.registry,
+                cls._meta.only_fields,
+                cls._meta.exclude_fields,
+                cls._meta.non_required_fields,
+            )
+            converted_fields.update(
+                construct_self_referenced_fields(self_referenced, cls._meta.registry)
+            )
+            mongoengine_fields = yank_fields_from_attrs(converted_fields, _as=graphene.Field)
+            if issubclass(cls, ObjectType):
+                construct_data_resolvers(cls, cls._meta.model, converted_fields, mongoengine_fields)
+            return mongoengine_fields
+
         @classmethod
         def rescan_fields(cls):
             """Attempts to rescan fields and will insert any not converted initially"""
-
+            if cls._meta.field_builder is not None:
+                # Lazy fields are yet to be built, against the registry of then
+                return
+
+            # Only the fields missing from the initial scan are converted again
+            only_fields = [
+                name
+                for name in get_model_fields(cls._meta.model)
+                if name not in cls._meta.fields
+                and (not cls._meta.only_fields or name in cls._meta.only_fields)
+            ]
+            if not only_fields:
+                return
             converted_fields, self_referenced = construct_fields(
                 cls._meta.model,
                 cls._meta.registry,
-                cls._meta.only_fields,
+                only_fields,
                 cls._meta.exclude_fields,
                 cls._meta.non_required_fields,
             )
@@ -242,9 +479,16 @@ def create_graphene_generic_class(object_type, option_type):
                 if to_snake_case(field) in cls._meta.model._fields_ordered:
                     required_fields.append(to_snake_case(field))
             required_fields = list(set(required_fields))
-            return await sync_to_async(
-                cls._meta.model.objects.no_dereference().only(*required_fields).get,
-            )(pk=id)
+            queryset = with_max_time_ms(
+                with_read_preference(
+                    get_routed_queryset(info, cls._meta.model, cls._meta.router)
+                    .no_dereference()
+                    .only(*required_fields),
+                    get_read_preference(info, cls._meta.read_preference),
+                ),
+                get_max_time_ms(info, cls._meta.max_time_ms),
+            )
+            return await sync_to_async(queryset.get)(pk=id)
 
         def resolve_id(self, info):
             return str(self.id)
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import graphene
 import mongoengine
 from graphene import InputObjectType
@@ -8,21 +10,59 @@ from graphene.types.utils import yank_fields_from_attrs
 from graphene.utils.str_converters import to_snake_case
 
 from graphene_mongo import AsyncMongoengineConnectionField
+from .aggregates import construct_aggregate_field, with_aggregate_field
 from .registry import Registry, get_global_async_registry, get_inputs_async_registry
-from .types import construct_fields, construct_self_referenced_fields
-from .utils import ExecutorEnum, get_query_fields, is_valid_mongoengine_model, sync_to_async
+from .types import (
+    LazyFieldsOptions,
+    construct_data_resolvers,
+    construct_fields,
+    construct_order_by_enum,
+    construct_self_referenced_fields,
+    create_lazy_fields_metaclass,
+)
+from .utils import (
+    ExecutorEnum,
+    get_max_time_ms,
+    get_model_fields,
+    get_model_indexes,
+    get_query_fields,
+    get_read_preference,
+    get_routed_queryset,
+    is_valid_mongoengine_model,
+    sync_to_async,
+    with_max_time_ms,
+    with_read_preference,
+)
 
 
 def create_graphene_generic_class_async(object_type, option_type):
-    class AsyncMongoengineGenericObjectTypeOptions(option_type):
+    class AsyncMongoengineGenericObjectTypeOptions(LazyFieldsOptions, option_type):
         model = None
         registry = None  # type: Registry
         connection = None
         filter_fields = ()
         non_required_fields = ()
         order_by = None
+        indexes = ()
+        index_policy = None
+        index_hint = False
+        max_time_ms = None
+        max_limit = None
+        read_preference = None
+        router = None
+        estimated_count = False
+        count_cache = None
+        page_cache = None
+        page_cache_ttl = None
+        page_cache_key = None
+        sortable_fields = ()
+        order_by_enum = None
+        filter_input = False
+        aggregate_fields = ()
 
-    class AsyncGrapheneMongoengineGenericType(object_type):
+    class AsyncGrapheneMongoengineGenericType(
+        object_type, metaclass=create_lazy_fields_metaclass(object_type)
+    ):
         @classmethod
         def __init_subclass_with_meta__(
             cls,
@@ -42,6 +82,21 @@ def create_graphene_generic_class_async(object_type, option_type):
             interfaces=(),
             _meta=None,
             order_by=None,
+            index_policy=None,
+            index_hint=False,
+            max_time_ms=None,
+            max_limit=None,
+            read_preference=None,
+            router=None,
+            estimated_count=False,
+            count_cache=None,
+            page_cache=None,
+            page_cache_ttl=None,
+            page_cache_key=None,
+            lazy=False,
+            sortable_fields=(),
+            filter_input=False,
+            aggregate_fields=(),
             **options,
         ):
             assert is_valid_mongoengine_model(model), (
@@ -60,15 +115,21 @@ def create_graphene_generic_class_async(object_type, option_type):
                 "The attribute registry in {}.Meta needs to be an instance of "
                 'Registry({}), received "{}".'
             ).format(object_type, cls.__name__, registry)
-            converted_fields, self_referenced = construct_fields(
-                model,
-                registry,
-                only_fields,
-                exclude_fields,
-                non_required_fields,
-                ExecutorEnum.ASYNC,
-            )
+            if lazy:
+                # Converted on first access to _meta.fields, see construct_lazy_fields
+                converted_fields, self_referenced = OrderedDict(), OrderedDict()
+            else:
+                converted_fields, self_referenced = construct_fields(
+                    model,
+                    registry,
+                    only_fields,
+                    exclude_fields,
+                    non_required_fields,
+                    ExecutorEnum.ASYNC,
+                )
             mongoengine_fields = yank_fields_from_attrs(converted_fields, _as=graphene.Field)
+            if issubclass(cls, ObjectType):
+                construct_data_resolvers(cls, model, converted_fields, mongoengine_fields)
             if use_connection is None and interfaces:
                 use_connection = any((issubclass(interface, Node) for interface in interfaces))
 
@@ -86,6 +147,13 @@ def create_graphene_generic_class_async(object_type, option_type):
                     "The attribute connection in {}.Meta must be of type Connection. "
                     'Received "{}" instead.'
                 ).format(cls.__name__, type(connection))
+                if aggregate_fields:
+                    connection = with_aggregate_field(
+                        connection,
+                        construct_aggregate_field(
+                            options.get("name") or cls.__name__, model, aggregate_fields
+                        ),
+                    )
 
             if connection_field_class is not None:
                 assert issubclass(connection_field_class, graphene.ConnectionField), (
@@ -116,6 +184,28 @@ def create_graphene_generic_class_async(object_type, option_type):
             _meta.exclude_fields = exclude_fields
             _meta.non_required_fields = non_required_fields
             _meta.order_by = order_by
+            _meta.indexes = get_model_indexes(model)
+            _meta.index_policy = index_policy
+            _meta.index_hint = index_hint
+            _meta.max_time_ms = max_time_ms
+            _meta.max_limit = max_limit
+            _meta.read_preference = read_preference
+            _meta.router = router
+            _meta.estimated_count = estimated_count
+            _meta.count_cache = count_cache
+            _meta.page_cache = page_cache
+            _meta.page_cache_ttl = page_cache_ttl
+            _meta.page_cache_key = page_cache_key
+            _meta.sortable_fields = tuple(sortable_fields)
+            _meta.filter_input = filter_input
+            _meta.aggregate_fields = tuple(aggregate_fields)
+            if sortable_fields:
+                _meta.order_by_enum = construct_order_by_enum(
+                    "{}OrderBy".format(options.get("name") or cls.__name__),
+                    model,
+                    sortable_fields,
+                )
+            _meta.field_builder = cls.construct_lazy_fields if lazy else None
 
             super(AsyncGrapheneMongoengineGenericType, cls).__init_subclass_with_meta__(
                 _meta=_meta, interfaces=interfaces, **options
@@ -134,14 +224,46 @@ def create_graphene_generic_class_async(object_type, option_type):
                     cls._meta.fields.update(mongoengine_fields)
                     registry.register(cls)
 
+        @classmethod
+        def construct_lazy_fields(cls):
+            converted_fields, self_referenced = construct_fields(
+                cls._meta.model,
+                cls._meta.registry,
+                cls._meta.only_fields,
+                cls._meta.exclude_fields,
+                cls._meta.non_required_fields,
+                ExecutorEnum.ASYNC,
+            )
+            converted_fields.update(
+                construct_self_referenced_fields(
+                    self_referenced, cls._meta.registry, ExecutorEnum.ASYNC
+                )
+            )
+            mongoengine_fields = yank_fields_from_attrs(converted_fields, _as=graphene.Field)
+            if issubclass(cls, ObjectType):
+                construct_data_resolvers(cls, cls._meta.model, converted_fields, mongoengine_fields)
+            return mongoengine_fields
+
         @classmethod
         def rescan_fields(cls):
             """Attempts to rescan fields and will insert any not converted initially"""
+            if cls._meta.field_builder is not None:
+                # Lazy fields are yet to be built, against the registry of then
+                return
 
+            # Only the fields missing from the initial scan are converted again
+            only_fields = [
+                name
+                for name in get_model_fields(cls._meta.model)
+                if name not in cls._meta.fields
+                and (not cls._meta.only_fields or name in cls._meta.only_fields)
+            ]
+            if not only_fields:
+                return
             converted_fields, self_referenced = construct_fields(
                 cls._meta.model,
                 cls._meta.registry,
-                cls._meta.only_fields,
+                only_fields,
                 cls._meta.exclude_fields,
                 cls._meta.non_required_fields,
                 ExecutorEnum.ASYNC,
@@ -179,9 +301,16 @@ def create_graphene_generic_class_async(object_type, option_type):
                 if to_snake_case(field) in cls._meta.model._fields_ordered:
                     required_fields.append(to_snake_case(field))
             required_fields = list(set(required_fields))
-            return await sync_to_async(
-                cls._meta.model.objects.no_dereference().only(*required_fields).get
-            )(pk=id)
+            queryset = with_max_time_ms(
+                with_read_preference(
+                    get_routed_queryset(info, cls._meta.model, cls._meta.router)
+                    .no_dereference()
+                    .only(*required_fields),
+                    get_read_preference(info, cls._meta.read_preference),
+                ),
+                get_max_time_ms(info, cls._meta.max_time_ms),
+            )
+            return await sync_to_async(queryset.get)(pk=id)
 
         def resolve_id(self, info):
             return str(self.id)
@@ -1,9 +1,13 @@
 from __future__ import unicode_literals
 
+import asyncio
 from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import enum
+import functools
 import inspect
+import time
 from typing import Any, Callable, Optional, Union
 
 from asgiref.sync import SyncToAsync
@@ -19,6 +23,8 @@ from graphql import (
 )
 from graphql_relay.connection.array_connection import offset_to_cursor
 import mongoengine
+from pymongo.errors import ExecutionTimeout
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 
 
 class ExecutorEnum(enum.Enum):
@@ -49,6 +55,99 @@ def get_model_reference_fields(model, excluding=None):
     return attributes
 
 
+def get_model_indexes(model):
+    """Returns the key patterns of the indexes declared on a model.
+
+    The implicit `_id` index comes first, followed by `meta["indexes"]` as
+    normalised by mongoengine (db field names, unique/geo indexes included).
+
+    Args:
+        model (mongoengine.Document)
+
+    Returns:
+        tuple: one tuple of (db_field, direction) pairs per index.
+    """
+    if not inspect.isclass(model) or not issubclass(model, mongoengine.Document):
+        return tuple()
+    indexes = [(("_id", 1),)]
+    for spec in model._meta.get("index_specs") or []:
+        indexes.append(tuple(tuple(key) for key in spec["fields"]))
+    return tuple(indexes)
+
+
+def find_index_for_query(indexes, filter_keys, sort_keys=()):
+    """Picks the index best able to serve a query.
+
+    An index can serve the query when its leading key is filtered on, or,
+    for unfiltered queries, when it is a prefix of the requested sort (in
+    either direction). A trailing `_id` sort key only breaks ties, e.g. the one
+    added by `get_order_by`, and indexes are taken as ending with it.
+
+    Args:
+        indexes (tuple): as returned by get_model_indexes
+        filter_keys (iterable): db field names present in the filter
+        sort_keys (iterable): (db_field, direction) pairs of the sort
+
+    Returns:
+        tuple: the key pattern of the chosen index, or None
+    """
+    filter_keys = set(filter_keys)
+    sort_keys = tuple(sort_keys)
+    if len(sort_keys) > 1 and sort_keys[-1][0] == "_id":
+        sort_keys = sort_keys[:-1]
+    best, best_score = None, 0
+    for index in indexes:
+        score = 0
+        for key, _ in index:
+            if key not in filter_keys:
+                break
+            score += 2
+        remaining = index[score // 2 :]
+        if sort_keys and len(remaining) >= len(sort_keys):
+            directions = [
+                direction * sort_direction
+                for (key, direction), (sort_key, sort_direction) in zip(remaining, sort_keys)
+                if key == sort_key and isinstance(direction, int)
+            ]
+            if len(directions) == len(sort_keys) and len(set(directions)) == 1:
+                score += 1
+        if score > best_score:
+            best, best_score = index, score
+    if filter_keys and best_score < 2:
+        return None
+    return best
+
+
+def get_filter_key_sets(query):
+    """
+    Splits a filter document into the sets of db field names an index has to serve,
+    one per `$or` branch, the keys of `$and` branches being merged in
+
+    Returns:
+        list: sets of db field names, or None when the filter uses `$nor`, which no
+            index can serve
+    """
+    keys = set()
+    key_sets = [keys]
+    for key, value in query.items():
+        if key in ("$and", "$or"):
+            branches = []
+            for each in value:
+                branch_key_sets = get_filter_key_sets(each)
+                if branch_key_sets is None:
+                    return None
+                branches.append(branch_key_sets)
+            if key == "$or":
+                branches = [[key_set for each in branches for key_set in each]]
+            for branch_key_sets in branches:
+                key_sets = [a | b for a in key_sets for b in branch_key_sets]
+        elif key == "$nor":
+            return None
+        elif not key.startswith("$"):
+            keys.add(key)
+    return [key_set | keys for key_set in key_sets]
+
+
 def is_valid_mongoengine_model(model):
     return inspect.isclass(model) and (
         issubclass(model, mongoengine.Document) or issubclass(model, mongoengine.EmbeddedDocument)
@@ -327,12 +426,26 @@ def ast_to_dict(node, include_loc=False):
     return node
 
 
-def find_skip_and_limit(first, last, after, before, count=None):
+# Most records a connection returns at once when neither the field nor its type set a
+# `max_limit`, `max_limit=0` returning them all
+DEFAULT_MAX_LIMIT = 1000
+
+
+def find_skip_and_limit(first, last, after, before, count=None, max_limit=DEFAULT_MAX_LIMIT):
     skip = 0
     limit = None
 
-    if last is not None and count is None:
+    # `before` bounds a `last` window by itself
+    if last is not None and before is None and count is None:
         raise ValueError("Count Missing")
+    if max_limit is not None:
+        for name, value in (("first", first), ("last", last)):
+            if value is not None and value > max_limit:
+                raise ValueError(
+                    "Requesting {} records with `{}` exceeds the limit of {} records".format(
+                        value, name, max_limit
+                    )
+                )
 
     if first is not None and after is not None:
         skip = after + 1
@@ -365,9 +478,98 @@ def find_skip_and_limit(first, last, after, before, count=None):
     elif before is not None:
         limit = before
 
+    if max_limit is not None and (limit is None or limit > max_limit):
+        limit = max_limit
+
     return skip, limit
 
 
+def get_stable_ordering(queryset):
+    """
+    The sort of `queryset` ending with `_id`, so that documents with equal sort values
+    come in the same order read from either end, None when it isn't sorted
+    """
+    ordering = queryset._ordering
+    if ordering is None:
+        ordering = queryset._get_order_by(queryset._document._meta["ordering"] or [])
+    if not ordering or not all(direction in (1, -1) for _, direction in ordering):
+        return None
+    if all(key != "_id" for key, _ in ordering):
+        ordering = list(ordering) + [("_id", ordering[-1][1])]
+    return ordering
+
+
+def get_reversed_ordering(queryset):
+    """The sort of `queryset` reversed, see get_stable_ordering"""
+    ordering = get_stable_ordering(queryset)
+    if ordering is None:
+        return None
+    return [(key, -direction) for key, direction in ordering]
+
+
+def with_stable_ordering(queryset):
+    """Applies the ordering of get_stable_ordering to a sorted queryset"""
+    ordering = get_stable_ordering(queryset)
+    if ordering is None or ordering == queryset._ordering:
+        return queryset
+    queryset = queryset.clone()
+    queryset._ordering = ordering
+    return queryset
+
+
+def fetch_window(queryset, count=None):
+    """
+    Evaluates the skip/limit window of a queryset matching `count` documents.
+
+    Sorted querysets are read with the stable ordering of get_stable_ordering, and a
+    window past the middle of their result set, e.g. the one of `last`, is read from
+    the end: the sort is reversed, so the server skips the documents after the
+    window rather than the ones before it, and the window is reversed back in memory.
+    """
+    queryset = with_stable_ordering(queryset)
+    skip, limit = queryset._skip or 0, queryset._limit
+    if count and limit:
+        limit = min(limit, count - skip)
+        tail = count - skip - limit
+        ordering = get_reversed_ordering(queryset) if 0 < limit and tail < skip else None
+        if ordering is not None:
+            queryset = queryset.clone()
+            queryset._ordering = ordering
+            return list(queryset.skip(tail).limit(limit))[::-1]
+    return list(queryset)
+
+
+def fetch_page(queryset, count=None):
+    """
+    Evaluates the skip/limit window of a queryset, see fetch_window, and tells whether
+    documents follow it: from `count` when known, else from one document fetched past
+    the window in the same query.
+
+    Returns:
+        (list, bool): the documents and whether there is a next page
+    """
+    skip, limit = queryset._skip or 0, queryset._limit
+    if count is not None:
+        documents = fetch_window(queryset, count)
+        return documents, skip + len(documents) < count
+    if not limit:
+        return list(queryset), False
+    documents = list(with_stable_ordering(queryset).limit(limit + 1))
+    return documents[:limit], len(documents) > limit
+
+
+def count_by_ids(queryset):
+    """
+    Counts the documents matching a queryset by streaming their ids only, for filters
+    `count_documents` rejects such as `$near`
+    """
+    collection = with_read_preference(queryset._collection, queryset._read_preference)
+    cursor = collection.find(queryset._query, {"_id": 1})
+    if queryset._max_time_ms is not None:
+        cursor = cursor.max_time_ms(queryset._max_time_ms)
+    return sum(1 for _ in cursor)
+
+
 def connection_from_iterables(
     edges,
     start_offset,
@@ -399,28 +601,106 @@ def connection_from_iterables(
     )
 
 
+_shared_executor = None
+
+
+def get_shared_executor() -> ThreadPoolExecutor:
+    global _shared_executor
+    if _shared_executor is None:
+        _shared_executor = ThreadPoolExecutor()
+    return _shared_executor
+
+
+class BlockingCallBatcher:
+    """
+    Runs the blocking calls submitted during one event loop iteration as a single
+    executor job, e.g. the reference lookups of every row of a page, and settles their
+    futures with a single callback back on the loop
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.pending = {}
+
+    def submit(self, func, *args, **kwargs) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        calls = self.pending.get(loop)
+        if calls is None:
+            calls = self.pending[loop] = []
+            loop.call_soon(self.dispatch, loop)
+        calls.append((future, contextvars.copy_context(), func, args, kwargs))
+        return future
+
+    def dispatch(self, loop):
+        calls = self.pending.pop(loop)
+        loop.run_in_executor(self.executor or get_shared_executor(), self.run, loop, calls)
+
+    @staticmethod
+    def run(loop, calls):
+        outcomes = []
+        try:
+            for future, context, func, args, kwargs in calls:
+                if future.cancelled():
+                    continue
+                try:
+                    outcomes.append((future, context.run(func, *args, **kwargs), None))
+                except Exception as error:
+                    outcomes.append((future, None, error))
+        except BaseException as error:
+            # e.g. KeyboardInterrupt, the calls left fail with it rather than never settle
+            settled = {future for future, _, _ in outcomes}
+            outcomes.extend((call[0], None, error) for call in calls if call[0] not in settled)
+            raise
+        finally:
+            loop.call_soon_threadsafe(BlockingCallBatcher.settle, outcomes)
+
+    @staticmethod
+    def settle(outcomes):
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+default_batcher = BlockingCallBatcher()
+
+
 def sync_to_async(
     func: Callable = None,
     thread_sensitive: bool = False,
     executor: Any = None,  # noqa
-) -> Union[SyncToAsync, Callable[[Callable[..., Any]], SyncToAsync]]:
+) -> Union[SyncToAsync, Callable[..., Any]]:
     """
-    Wrapper over sync_to_async from asgiref.sync
-    Defaults to thread insensitive with ThreadPoolExecutor of n workers
+    Converts a blocking function to a coroutine function
+    Defaults to thread insensitive, the calls made during one event loop iteration
+    running together in one job of a shared ThreadPoolExecutor, see BlockingCallBatcher
     Args:
         func:
             Function to be converted to coroutine
         thread_sensitive:
-            If the operation is thread sensitive and should run in synchronous thread
+            If the operation is thread sensitive and should run in synchronous thread,
+            through sync_to_async from asgiref.sync
         executor:
-            Threadpool executor, if thread_sensitive=False
+            Threadpool executor, if thread_sensitive=False, through sync_to_async from
+            asgiref.sync
 
     Returns:
         coroutine version of func
     """
-    if executor is None:
-        executor = ThreadPoolExecutor()
-    return asgiref_sync_to_async(func=func, thread_sensitive=thread_sensitive, executor=executor)
+    if func is None or thread_sensitive or executor is not None:
+        return asgiref_sync_to_async(
+            func=func, thread_sensitive=thread_sensitive, executor=executor
+        )
+
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        return await default_batcher.submit(func, *args, **kwargs)
+
+    return run
 
 
 def get_field_resolver(
@@ -448,3 +728,173 @@ def get_field_resolver(
         return default_async_resolver
 
     return default_sync_resolver
+
+
+def get_context_value(info, name, default=None):
+    """Reads a request-scoped value from `info.context` (a dict or an object)."""
+    context = getattr(info, "context", None)
+    if isinstance(context, dict):
+        return context.get(name, default)
+    return getattr(context, name, default)
+
+
+def set_context_value(info, name, value):
+    """Stores a request-scoped value on `info.context`, when there is one."""
+    context = getattr(info, "context", None)
+    if context is None:
+        return False
+    if isinstance(context, dict):
+        context[name] = value
+    else:
+        setattr(context, name, value)
+    return True
+
+
+def deadline_exceeded():
+    return ExecutionTimeout("operation exceeded time limit", 50)
+
+
+def get_max_time_ms(info, max_time_ms=None):
+    """
+    Returns the server-side time limit for a query issued while resolving `info`
+
+    The limit is the smaller of `max_time_ms` (set on the field or the type) and what
+    is left of the request budget, given as `graphene_mongo_max_time_ms` on
+    `info.context`. The request deadline is fixed the first time it is consulted, so
+    nested resolvers only get the remaining budget.
+
+    Args:
+        info (ResolveInfo)
+        max_time_ms (int): field/type level limit (optional)
+
+    Returns:
+        int: milliseconds, or None when there is no limit
+
+    Raises:
+        ExecutionTimeout: once the request deadline has passed
+    """
+    request_max_time_ms = get_context_value(info, "graphene_mongo_max_time_ms")
+    if request_max_time_ms is None:
+        return max_time_ms
+    now = time.monotonic()
+    deadline = get_context_value(info, "graphene_mongo_deadline")
+    if deadline is None:
+        deadline = now + request_max_time_ms / 1000.0
+        set_context_value(info, "graphene_mongo_deadline", deadline)
+    remaining = int((deadline - now) * 1000)
+    if remaining <= 0:
+        raise deadline_exceeded()
+    return remaining if max_time_ms is None else min(max_time_ms, remaining)
+
+
+def get_model_max_time_ms(info, registry, model, executor: ExecutorEnum = ExecutorEnum.SYNC):
+    """Same as get_max_time_ms, using the `max_time_ms` of the type registered for `model`"""
+    _type = registry.get_type_for_model(model, executor=executor)
+    return get_max_time_ms(info, getattr(getattr(_type, "_meta", None), "max_time_ms", None))
+
+
+def with_max_time_ms(queryset, max_time_ms):
+    """Applies a server-side time limit to a queryset, when there is one"""
+    if max_time_ms is None:
+        return queryset
+    return queryset.max_time_ms(max_time_ms)
+
+
+def to_read_preference(read_preference):
+    """Accepts a pymongo read preference or the name of its mode, e.g. "secondaryPreferred" """
+    if isinstance(read_preference, str):
+        return make_read_preference(read_pref_mode_from_name(read_preference), None)
+    return read_preference
+
+
+def get_read_preference(info, read_preference=None):
+    """
+    Returns the read preference of the queries issued while resolving `info`: the one
+    given as `graphene_mongo_read_preference` on `info.context`, else `read_preference` (set on the
+    field or the type), None meaning the connection's default
+    """
+    return to_read_preference(
+        get_context_value(info, "graphene_mongo_read_preference") or read_preference
+    )
+
+
+def get_model_read_preference(info, registry, model, executor: ExecutorEnum = ExecutorEnum.SYNC):
+    """Same as get_read_preference, using the `read_preference` of the type registered for `model`"""
+    _type = registry.get_type_for_model(model, executor=executor)
+    return get_read_preference(
+        info, getattr(getattr(_type, "_meta", None), "read_preference", None)
+    )
+
+
+def with_read_preference(queryset, read_preference):
+    """Applies a read preference to a queryset or a collection, when there is one"""
+    if read_preference is None:
+        return queryset
+    if isinstance(queryset, mongoengine.queryset.base.BaseQuerySet):
+        return queryset.read_preference(read_preference)
+    return queryset.with_options(read_preference=read_preference)
+
+
+def default_router(model, info=None):
+    """Routes `model` to the `db_alias` and collection declared on its meta"""
+    return (
+        model._meta.get("db_alias", mongoengine.DEFAULT_CONNECTION_NAME),
+        model._get_collection_name(),
+    )
+
+
+def get_router(info, router=None):
+    """
+    Returns the router of the queries issued while resolving `info`: the one given as
+    `graphene_mongo_router` on `info.context`, else `router` (set on the field or the type), else
+    default_router. A router is a callable `(model, info) -> (alias, collection name)`.
+    """
+    return get_context_value(info, "graphene_mongo_router") or router or default_router
+
+
+def get_model_router(info, registry, model, executor: ExecutorEnum = ExecutorEnum.SYNC):
+    """Same as get_router, using the `router` of the type registered for `model`"""
+    _type = registry.get_type_for_model(model, executor=executor)
+    return get_router(info, getattr(getattr(_type, "_meta", None), "router", None))
+
+
+def get_routed_collection(info, model, router=None):
+    """The pymongo collection `model` is routed to for `info`"""
+    alias, collection_name = get_router(info, router)(model, info)
+    return mongoengine.get_db(alias)[collection_name]
+
+
+def get_routed_queryset(info, model, router=None):
+    """
+    `model.objects`, on the collection `model` is routed to for `info`, filtered by the
+    function of a custom `queryset_manager` like `model.objects` is. Documents read
+    from a routed collection are not bound to it, they should be written back with the
+    same routing.
+    """
+    route = get_router(info, router)(model, info)
+    if route == default_router(model):
+        return model.objects
+    alias, collection_name = route
+    queryset_class = model._meta.get("queryset_class", mongoengine.QuerySet)
+    queryset = queryset_class(model, mongoengine.get_db(alias)[collection_name])
+    manager = next((vars(cls)["objects"] for cls in model.__mro__ if "objects" in vars(cls)), None)
+    get_queryset = getattr(manager, "get_queryset", None)
+    if get_queryset is None:
+        return queryset
+    # Same signatures as mongoengine's QuerySetManager
+    if get_queryset.__code__.co_argcount == 1:
+        return get_queryset(queryset)
+    return get_queryset(model, queryset)
+
+
+async def gather_with_deadline(tasks, max_time_ms=None):
+    """Gathers tasks, cancelling the ones still pending once `max_time_ms` has elapsed"""
+    if max_time_ms is None:
+        return await asyncio.gather(*tasks)
+    gathered = asyncio.ensure_future(asyncio.gather(*tasks))
+    done, _ = await asyncio.wait([gathered], timeout=max_time_ms / 1000.0)
+    if not done:
+        gathered.cancel()
+        await asyncio.gather(gathered, return_exceptions=True)
+        raise deadline_exceeded()
+    return gathered.result()